@@ -3,89 +3,227 @@ import os
 # from PyQt5 import QtWidgets, uic # PyQt5 관련 임포트 주석 처리 또는 삭제
 # from PyQt5.QtWidgets import QFileDialog, QMessageBox
 # from PyQt5.QtCore import QThread, pyqtSignal
-import subprocess
+import asyncio
 import json
+import logging
+import threading
 from pathlib import Path
 
+# orjson이 있으면 설정 파일 파싱/직렬화에 사용 (없으면 표준 json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # PyQt6 임포트
 from PyQt6 import QtWidgets
 from PyQt6.QtWidgets import QFileDialog, QMessageBox
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
 
 # pyuic6로 변환된 UI 파일에서 클래스 임포트
 # pyuic6 실행 시 -o 옵션으로 지정한 파일 이름과 Ui_MainWindow 클래스 이름이 맞는지 확인하세요.
 from legacy.ui_main_gui import Ui_MainWindow
 
+# 캡처/PDF/OCR 스크립트는 모듈로 직접 임포트하여 같은 프로세스에서 호출
+import shot
+import pdf
+import llm_ocr
+
 SETTINGS_PATH = str(Path.home() / '.capture_gui_settings.json')
+SAVE_DEBOUNCE_MS = 500
+LOG_BATCH_LINES = 16
+LOG_FLUSH_INTERVAL = 0.1
+
+
+def _read_settings(path):
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 
-class Worker(QThread):
-    # PyQt6 시그널 선언 방식 (PyQt5와 동일)
+def _write_settings(path, data):
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+class WorkerSignals(QObject):
+    # QRunnable은 QObject가 아니므로 시그널은 별도 객체에 둡니다.
     log_signal = pyqtSignal(str)
     finished_signal = pyqtSignal()
     error_signal = pyqtSignal(str)
 
+
+class _WorkerLogHandler(logging.Handler):
+    """shot/pdf/llm_ocr 모듈의 로그 레코드를 Worker._log로 넘깁니다 (이벤트 루프 스레드에서 실행)."""
+
+    def __init__(self, worker, loop):
+        super().__init__(logging.INFO)
+        self.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+        self._worker = worker
+        self._loop = loop
+
+    def emit(self, record):
+        try:
+            self._loop.call_soon_threadsafe(self._worker._log, self.format(record))
+        except RuntimeError:
+            # 루프가 이미 닫힌 뒤에 들어온 레코드는 버림
+            pass
+
+
+class Worker(QRunnable):
     def __init__(self, params):
         super().__init__()
         self.params = params
+        self.signals = WorkerSignals()
+        self._log_buf = []
+        self._flush_handle = None
+        # 한 단계가 실패하면 캡처 스레드가 다음 페이지에서 멈추도록 알림
+        self._abort = threading.Event()
 
     def run(self):
         try:
-            # 단계별 실행
-            if self.params['capture']:
-                self.log_signal.emit('[1/3] 캡처 시작...')
-                cmd = [
-                    'python3', 'shot.py',
-                    '--app', self.params['app_name'],
-                    '--label', self.params['window_label'],
-                    '--output-dir', self.params['output_dir'],
-                    '--book', self.params['book'],
-                    '--start', str(self.params['start']),
-                    '--no', str(self.params['no']),
-                    '--next', self.params['next_action'],
-                    '--delay', str(self.params['delay']),
-                    '--width', str(self.params['width']),
-                    '--height', str(self.params['height']),\
-                    '--top', str(self.params['top']),
-                    '--bottom', str(self.params['bottom']),\
-                    '--left', str(self.params['left']),\
-                    '--right', str(self.params['right'])
-                ]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                self.log_signal.emit(result.stdout)
-                if result.returncode != 0:
-                    self.error_signal.emit(result.stderr)
-                    return
+            # 풀 스레드 안에서 이벤트 루프를 돌려 캡처/PDF/OCR 단계를 파이프라인으로 실행
+            asyncio.run(self._run_pipeline())
+        except Exception as e:
+            self._flush_log()
+            self.signals.error_signal.emit(str(e))
+        else:
+            self._flush_log()
+            self.signals.finished_signal.emit()
+
+    def _log(self, line):
+        # 줄마다 시그널을 보내지 않고 모아서 전달 (GUI 스레드로의 큐 이벤트/깨우기 횟수 감소)
+        # LOG_BATCH_LINES 줄이 모이거나 첫 줄 이후 LOG_FLUSH_INTERVAL초가 지나면 한 번에 보냄
+        self._log_buf.append(line)
+        if len(self._log_buf) >= LOG_BATCH_LINES:
+            self._flush_log()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(LOG_FLUSH_INTERVAL, self._flush_log)
+
+    def _flush_log(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._log_buf:
+            self.signals.log_signal.emit('\n'.join(self._log_buf))
+            self._log_buf.clear()
+
+    async def _pdf_dir(self):
+        self._log('[2/3] PDF 변환 시작...')
+        p = self.params
+        await asyncio.to_thread(
+            pdf.process_directory, p['output_dir'], None, p['lang'], p['tess_path'], p['pdf_merge'])
+
+    async def _ocr_dir(self):
+        self._log('[3/3] OCR 시작...')
+        await asyncio.to_thread(llm_ocr.process_directory, self.params['output_dir'], None, self.params['ocr_merge'])
+
+    async def _pdf_stage(self, queue):
+        # 캡처된 페이지를 하나씩 PDF로 변환하고, 캡처가 끝나면 (필요 시) 병합
+        self._log('[2/3] PDF 변환 시작...')
+        p = self.params
+        while True:
+            page = await queue.get()
+            if page is None:
+                break
+            png, image = page
+            # 캡처 단계가 넘겨준 이미지를 그대로 tesseract stdin으로 전달 (PNG를 다시 읽지 않음)
+            await asyncio.to_thread(pdf.process_file, png, None, p['lang'], p['tess_path'], image)
+        if p['pdf_merge']:
+            await asyncio.to_thread(
+                pdf.process_directory, p['output_dir'], None, p['lang'], p['tess_path'], True)
+
+    async def _ocr_stage(self, queue):
+        self._log('[3/3] OCR 시작...')
+        while True:
+            page = await queue.get()
+            if page is None:
+                break
+            png, _ = page
+            await asyncio.to_thread(llm_ocr.process_file, png)
+        if self.params['ocr_merge']:
+            await asyncio.to_thread(llm_ocr.process_directory, self.params['output_dir'], None, True)
+
+    async def _run_pipeline(self):
+        # 스크립트를 자식 프로세스로 다시 실행하지 않고 모듈 함수를 직접 호출 (인터프리터 기동/재임포트 비용 제거)
+        # 모듈 로그는 핸들러를 통해 GUI 로그 창으로 전달
+        handler = _WorkerLogHandler(self, asyncio.get_running_loop())
+        loggers = [logging.getLogger(name) for name in ('window_capture', 'pdf', 'llm_ocr')]
+        # 실행 중에만 INFO로 낮추고 끝나면 원래 레벨로 되돌림 (batch_capture 등이 바꾼 레벨도 함께 복원)
+        levels = [logger.level for logger in loggers]
+        for logger in loggers:
+            if logger.level == logging.NOTSET:
+                logger.setLevel(logging.INFO)
+            logger.addHandler(handler)
+        try:
+            await self._run_stages()
+        finally:
+            for logger, level in zip(loggers, levels):
+                logger.removeHandler(handler)
+                logger.setLevel(level)
+
+    async def _run_stages(self):
+        if not self.params['capture']:
+            # 캡처 없이 기존 디렉토리만 처리. PDF와 OCR은 서로의 결과를 읽지 않으므로
+            # (PNG만 입력으로 사용, 병합 파일 이름도 다름) 동시에 실행
+            stages = []
             if self.params['pdf']:
-                self.log_signal.emit('[2/3] PDF 변환 시작...')
-                cmd = [
-                    'python3', 'pdf.py',
-                    '--input-dir', self.params['output_dir'],
-                    '--lang', self.params['lang'],
-                    '--tess', self.params['tess_path']
-                ]
-                if self.params['pdf_merge']:
-                    cmd.append('--merge')
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                self.log_signal.emit(result.stdout)
-                if result.returncode != 0:
-                    self.error_signal.emit(result.stderr)
-                    return
+                stages.append(self._pdf_dir())
             if self.params['ocr']:
-                self.log_signal.emit('[3/3] OCR 시작...')
-                cmd = [
-                    'python3', 'llm_ocr.py',
-                    '--input-dir', self.params['output_dir']
-                ]
-                if self.params['ocr_merge']:\
-                    cmd.append('--merge')
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                self.log_signal.emit(result.stdout)
-                if result.returncode != 0:
-                    self.error_signal.emit(result.stderr)
-                    return
-            self.finished_signal.emit()
-        except Exception as e:
-            self.error_signal.emit(str(e))
+                stages.append(self._ocr_dir())
+            await self._gather_stages(stages)
+            return
+
+        # 캡처 → PDF / OCR 단계를 asyncio.Queue로 연결하여 페이지 단위로 겹쳐 실행
+        queues = []
+        stages = []
+        if self.params['pdf']:
+            queues.append(asyncio.Queue(maxsize=2))
+            stages.append(self._pdf_stage(queues[-1]))
+        if self.params['ocr']:
+            queues.append(asyncio.Queue(maxsize=2))
+            stages.append(self._ocr_stage(queues[-1]))
+        loop = asyncio.get_running_loop()
+
+        async def enqueue(page):
+            for queue in queues:
+                await queue.put(page)
+
+        def on_page(path, image):
+            # 캡처 스레드에서 호출됨. 큐가 가득 차면 소비자가 따라올 때까지 캡처를 멈춤
+            if self._abort.is_set():
+                raise RuntimeError('다른 단계가 실패하여 캡처를 중단합니다.')
+            asyncio.run_coroutine_threadsafe(enqueue((path, image)), loop).result()
+
+        async def capture_stage():
+            self._log('[1/3] 캡처 시작...')
+            p = self.params
+            await asyncio.to_thread(
+                shot.batch_capture,
+                p['app_name'], p['window_label'], p['output_dir'], p['book'], p['start'], p['no'],
+                p['next_action'], p['delay'], p['width'], p['height'],
+                p['top'], p['bottom'], p['left'], p['right'],
+                log_level='INFO', on_page=on_page)
+            await enqueue(None)
+
+        await self._gather_stages([capture_stage(), *stages])
+
+    async def _gather_stages(self, stages):
+        tasks = [asyncio.create_task(stage) for stage in stages]
+        try:
+            await asyncio.gather(*tasks)
+        except Exception:
+            # 한 단계가 실패하면 나머지 단계도 중단 (이미 실행 중인 스레드 작업은 끝날 때까지 기다림)
+            self._abort.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
 
 
 class ShotGui(QtWidgets.QMainWindow):
@@ -101,14 +239,23 @@ class ShotGui(QtWidgets.QMainWindow):
         self.ui.browseOutputDirButton.clicked.connect(self.browse_output_dir)
         self.ui.runButton.clicked.connect(self.start_workflow)
 
+        # 저장 요청은 타이머로 모아서 한 번만 기록 (연속 클릭 시 중복 쓰기 방지)
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(SAVE_DEBOUNCE_MS)
+        self._save_timer.timeout.connect(self.save_settings)
+
         # 메뉴 액션 연결 (self.ui.action이름 형태 사용)
-        self.ui.actionSaveSettings.triggered.connect(self.save_settings)
+        self.ui.actionSaveSettings.triggered.connect(lambda: self._save_timer.start())
         self.ui.actionLoadSettings.triggered.connect(self.load_settings)
 
         # 로그 영역 (self.ui.logTextEdit 형태 사용)
         self.ui.logTextEdit.setReadOnly(True)
 
         self.worker = None
+        self._active_jobs = 0
+        # 마지막으로 읽거나 기록한 설정 내용 (디스크와 동일한 상태)
+        self._settings_cache = None
 
         # defaults 리스트에서도 위젯 접근 방식을 self.ui.위젯 형태로 변경
         self.defaults = [
@@ -133,6 +280,16 @@ class ShotGui(QtWidgets.QMainWindow):
             (self.ui.textCheckBox, False, 'setChecked', 'checked'),
             (self.ui.mergeCheckBox, False, 'setChecked', 'checked'),
         ]
+        # 저장/불러오기 루프에서 문자열 getattr 대신 바로 호출할 수 있도록 바인딩된 메서드를 미리 준비
+        getter_names = {'text': 'text', 'value': 'value', 'checked': 'isChecked'}
+        self._setters = [
+            (widget.objectName(), getattr(widget, set_method), default, value_type == 'checked')
+            for widget, default, set_method, value_type in self.defaults
+        ]
+        self._getters = [
+            (widget.objectName(), getattr(widget, getter_names[value_type]))
+            for widget, _, _, value_type in self.defaults
+        ]
 
         self.load_settings()
 
@@ -146,44 +303,35 @@ class ShotGui(QtWidgets.QMainWindow):
 
     def load_settings(self):
         try:
-            with open(SETTINGS_PATH, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            # self.defaults 리스트의 widget 항목은 이미 self.ui.위젯 형태로 변경되었으므로 추가 수정 불필요
-            for widget, default, set_method, value_type in self.defaults:
-                key = widget.objectName()
+            # 설정 파일은 처음 한 번만 파싱하고 이후에는 캐시를 사용
+            if self._settings_cache is None:
+                self._settings_cache = _read_settings(SETTINGS_PATH)
+            data = self._settings_cache
+            for key, setter, default, is_checked in self._setters:
                 if key in data:
                     value = data[key]
-                    if value_type == 'checked':
-                        getattr(widget, set_method)(bool(value))
-                    else:
-                        getattr(widget, set_method)(value)
+                    setter(bool(value) if is_checked else value)
                 else:
-                    getattr(widget, set_method)(default)
+                    setter(default)
         except Exception:
             # 파일 없거나 파싱 실패 시 defaults 적용
-            # self.defaults 리스트의 widget 항목은 이미 self.ui.위젯 형태로 변경되었으므로 추가 수정 불필요
-            for widget, default, set_method, _ in self.defaults:
-                getattr(widget, set_method)(default)
+            for _, setter, default, _ in self._setters:
+                setter(default)
 
     def save_settings(self):
-        data = {}
-        # self.defaults 리스트의 widget 항목은 이미 self.ui.위젯 형태로 변경되었으므로 추가 수정 불필요
-        for widget, _, _, value_type in self.defaults:
-            key = widget.objectName()
-            if value_type == 'text':
-                data[key] = widget.text()
-            elif value_type == 'value':
-                data[key] = widget.value()
-            elif value_type == 'checked':
-                data[key] = widget.isChecked()
+        data = {key: getter() for key, getter in self._getters}
+        # 마지막 저장 내용과 같으면 디스크 쓰기 생략
+        if data == self._settings_cache:
+            return
         try:
-            with open(SETTINGS_PATH, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            _write_settings(SETTINGS_PATH, data)
+            self._settings_cache = data
         except Exception as e:
             print(f"[WARN] Failed to save settings: {e}")
 
-    # closeEvent 메소드는 변경 필요 없음
     def closeEvent(self, event):
+        # 대기 중인 지연 저장을 취소하고 즉시 저장
+        self._save_timer.stop()
         self.save_settings()
         super().closeEvent(event)
 
@@ -221,17 +369,26 @@ class ShotGui(QtWidgets.QMainWindow):
         }
         return params
 
+    def _job_done(self):
+        # 완료/에러 시그널은 GUI 스레드에서 전달되므로 별도 잠금 없이 카운터를 줄입니다.
+        self._active_jobs -= 1
+
     def start_workflow(self):
-        if self.worker and self.worker.isRunning():
+        if self._active_jobs:
             self.ui.logTextEdit.append('이미 실행 중입니다.') # self.ui 추가
             return
         params = self.get_params() # get_params 내부에서 이미 self.ui 반영됨
         self.worker = Worker(params)
-        self.worker.log_signal.connect(self.ui.logTextEdit.append) # self.ui 추가
+        signals = self.worker.signals
+        signals.log_signal.connect(self.ui.logTextEdit.append) # self.ui 추가
         # QMessageBox는 PyQt6.QtWidgets에서 임포트하므로 변경 없음
-        self.worker.error_signal.connect(lambda msg: QMessageBox.critical(self, 'Error', msg))
-        self.worker.finished_signal.connect(lambda: self.ui.logTextEdit.append('완료.')) # self.ui 추가
-        self.worker.start()
+        signals.error_signal.connect(lambda msg: QMessageBox.critical(self, 'Error', msg))
+        signals.finished_signal.connect(lambda: self.ui.logTextEdit.append('완료.')) # self.ui 추가
+        signals.error_signal.connect(self._job_done)
+        signals.finished_signal.connect(self._job_done)
+        self._active_jobs += 1
+        # 매번 QThread를 새로 만들지 않고 전역 스레드 풀에서 실행
+        QThreadPool.globalInstance().start(self.worker)
 
 # main 실행 부분은 변경 필요 없음
 if __name__ == '__main__':
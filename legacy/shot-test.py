@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 import os
 import argparse
+import hashlib
 import logging
 import sys
 import platform
+import re
 import subprocess
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 
 # Attempt to import pyautogui for screen/window capture. If unavailable, set to None for graceful error handling later.
@@ -14,8 +18,19 @@ try:
 except ImportError:
     pyautogui = None
 
+# mss grabs screen regions in-process through CoreGraphics; pyautogui shells out to `screencapture` per call.
+# Use it when available and keep pyautogui as the fallback.
+try:
+    import mss
+except ImportError:
+    mss = None
+
 from PIL import Image
 
+# The persistent osascript session lives in shot.py (repository root, one level up from this script).
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from shot import AppleScriptSession
+
 # Configure logger for this module. This allows for flexible log level control and consistent formatting.
 logger = logging.getLogger('window_capture')
 ch = logging.StreamHandler()
@@ -23,11 +38,60 @@ formatter = logging.Formatter('%(levelname)s: %(message)s')
 ch.setFormatter(formatter)
 logger.addHandler(ch)
 
+# Parsed AppleScript window list shared by list_windows/get_window_info (see WindowCapture._enumerate_windows).
+_WINDOW_CACHE = {'ts': 0, 'data': None}
+# Compiled AppleScript (.scpt) files, keyed by script name (see _compiled_script).
+SCRIPT_CACHE_DIR = Path.home() / '.cache' / 'capture_mac'
+_COMPILED_SCRIPTS = {}
+# Lazily created mss grabber, reused across pages (see _grab_region).
+_SCT = None
+# Encoder settings per --image-format. Outputs are OCR intermediates, so PNG uses the fastest zlib level
+# and WebP the fastest lossless method.
+SAVE_OPTIONS = {
+    'png': {'format': 'PNG', 'compress_level': 1, 'optimize': False},
+    'webp': {'format': 'WEBP', 'lossless': True, 'quality': 80, 'method': 0},
+    'jpg': {'format': 'JPEG', 'quality': 92},
+}
+# One "app|title|x|y|w|h" line of the AppleScript window list. The title is greedy so it may contain '|' or ','.
+WIN_RE = re.compile(r'^([^|\n]+)\|(.*)\|(-?\d+)\|(-?\d+)\|(\d+)\|(\d+)$', re.MULTILINE)
+
 class WindowCapture:
     """
     macOS only: Provides window and fullscreen capture using pyautogui and AppleScript.
     This class centralizes all capture-related logic for maintainability and platform-specific handling.
     """
+    # Window enumeration script shared by list_windows/get_window_info through _enumerate_windows.
+    _ENUM_SCRIPT = '''
+    tell application "System Events"
+        set windowList to {}
+        repeat with proc in (every process whose background only is false)
+            try
+                set procName to name of proc
+                repeat with win in (every window of proc)
+                    try
+                        set winName to name of win
+                        set winPos to position of win
+                        set winSize to size of win
+                        set x to item 1 of winPos
+                        set y to item 2 of winPos
+                        set w to item 1 of winSize
+                        set h to item 2 of winSize
+                        if w > 10 and h > 10 then
+                            if winName is "" then set winName to "<" & procName & ">"
+                            set end of windowList to procName & "|" & winName & "|" & x & "|" & y & "|" & w & "|" & h
+                        end if
+                    end try
+                end repeat
+            end try
+        end repeat
+        -- One window per line: no list braces, commas or quotes to strip in Python.
+        set AppleScript's text item delimiters to linefeed
+        set windowText to windowList as text
+        set AppleScript's text item delimiters to ""
+        return windowText
+    end tell
+    '''
+
     @staticmethod
     def _check_dependencies():
         # Check for required dependencies and platform. This ensures the tool fails fast with clear errors if misconfigured.
@@ -46,54 +110,55 @@ class WindowCapture:
             return False
         return True
 
+    @staticmethod
+    def _run_enum_script():
+        """
+        Run the window enumeration script and return its raw output (one window per line), or None on failure.
+        """
+        result = _run_applescript('enum_windows', WindowCapture._ENUM_SCRIPT, timeout=15)
+        if result.returncode != 0:
+            logger.error(f"AppleScript failed: {result.stderr}")
+            return None
+        return result.stdout
+
+    @staticmethod
+    def _enumerate_windows(ttl=1.0):
+        """
+        Return all visible windows as (app name, title, x, y, w, h) tuples, or None on failure.
+        AppleScript enumeration walks every process and window, so the parsed result is cached for `ttl` seconds.
+        """
+        if _WINDOW_CACHE['data'] is not None and time.monotonic() - _WINDOW_CACHE['ts'] < ttl:
+            return _WINDOW_CACHE['data']
+        output = WindowCapture._run_enum_script()
+        if output is None:
+            return None
+        # One regex pass over the lines yields the six fields per window; AppleScript reports integer coordinates.
+        windows = [
+            (m.group(1), m.group(2), int(m.group(3)), int(m.group(4)), int(m.group(5)), int(m.group(6)))
+            for m in WIN_RE.finditer(output)
+        ]
+        _WINDOW_CACHE['ts'] = time.monotonic()
+        _WINDOW_CACHE['data'] = windows
+        return windows
+
     @staticmethod
     def list_windows():
         """
         Print all available windows (app name, title, position, size).
         Uses AppleScript to enumerate windows, as Python cannot natively access this info on macOS.
+        Rows are printed as they are matched instead of building the whole window list first.
         """
-        script = '''
-        tell application "System Events"
-            set windowList to {}
-            repeat with proc in (every process whose background only is false)
-                try
-                    set procName to name of proc
-                    repeat with win in (every window of proc)
-                        try
-                            set winName to name of win
-                            set winPos to position of win
-                            set winSize to size of win
-                            set x to item 1 of winPos
-                            set y to item 2 of winPos
-                            set w to item 1 of winSize
-                            set h to item 2 of winSize
-                            if w > 10 and h > 10 then
-                                if winName is "" then set winName to "<" & procName & ">"
-                                set end of windowList to procName & "|" & winName & "|" & x & "|" & y & "|" & w & "|" & h
-                            end if
-                        end try
-                    end repeat
-                end try
-            end repeat
-            return windowList
-        end tell
-        '''
-        result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True, timeout=15)
-        if result.returncode != 0:
-            logger.error(f"AppleScript failed: {result.stderr}")
+        output = WindowCapture._run_enum_script()
+        if output is None:
             return
-        windows_data = result.stdout.strip()
-        if not windows_data or windows_data == "{}":
+        count = 0
+        for count, m in enumerate(WIN_RE.finditer(output), 1):
+            if count == 1:
+                print("\nAvailable Windows:")
+            proc_name, win_name, x, y, w, h = m.groups()
+            print(f"{count:2d}. [{proc_name}] {win_name}  ({x},{y}) {w}x{h}")
+        if not count:
             logger.error("No windows found")
-            return
-        content = windows_data[1:-1] if windows_data.startswith('{') and windows_data.endswith('}') else windows_data
-        items = [i.strip().strip('"') for i in content.split(',') if i.strip()]
-        print("\nAvailable Windows:")
-        for i, item in enumerate(items, 1):
-            parts = item.split('|')
-            if len(parts) == 6:
-                proc_name, win_name, x, y, w, h = parts
-                print(f"{i:2d}. [{proc_name}] {win_name}  ({x},{y}) {w}x{h}")
 
     @staticmethod
     def get_window_info(app_name=None, window_title=None):
@@ -103,52 +168,12 @@ class WindowCapture:
         """
         if not WindowCapture._check_dependencies():
             return None
-        script = '''
-        tell application "System Events"
-            set windowList to {}
-            repeat with proc in (every process whose background only is false)
-                try
-                    set procName to name of proc
-                    repeat with win in (every window of proc)
-                        try
-                            set winName to name of win
-                            set winPos to position of win
-                            set winSize to size of win
-                            set x to item 1 of winPos
-                            set y to item 2 of winPos
-                            set w to item 1 of winSize
-                            set h to item 2 of winSize
-                            if w > 10 and h > 10 then
-                                if winName is "" then set winName to "<" & procName & ">"
-                                set end of windowList to procName & "|" & winName & "|" & x & "|" & y & "|" & w & "|" & h
-                            end if
-                        end try
-                    end repeat
-                end try
-            end repeat
-            return windowList
-        end tell
-        '''
-        result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True, timeout=15)
-        if result.returncode != 0:
-            logger.error(f"AppleScript failed: {result.stderr}")
+        windows = WindowCapture._enumerate_windows()
+        if windows is None:
             return None
-        windows_data = result.stdout.strip()
-        if not windows_data or windows_data == "{}":
+        if not windows:
             logger.error("No windows found")
             return None
-        windows = []
-        content = windows_data[1:-1] if windows_data.startswith('{') and windows_data.endswith('}') else windows_data
-        items = [i.strip().strip('"') for i in content.split(',') if i.strip()]
-        for item in items:
-            parts = item.split('|')
-            if len(parts) == 6:
-                try:
-                    proc_name, win_name, x, y, w, h = parts
-                    x, y, w, h = int(float(x)), int(float(y)), int(float(w)), int(float(h))
-                    windows.append((proc_name, win_name, x, y, w, h))
-                except Exception:
-                    continue
         # Only exact match (case-insensitive) to avoid ambiguity and ensure user intent.
         for proc_name, win_name, x, y, w, h in windows:
             if app_name and proc_name.lower() == app_name.lower():
@@ -159,22 +184,32 @@ class WindowCapture:
         return None
 
     @staticmethod
-    def capture_window(x, y, width, height, output_path):
+    def _grab_region(x, y, width, height):
         """
-        Capture the left third of a window using pyautogui, then crop and save.
-        This approach is chosen to focus on a specific region (e.g., for book scanning or document capture).
+        Grab a screen region with mss (in-process, no temp file) and return it as an RGB PIL image.
+        """
+        global _SCT
+        if _SCT is None:
+            _SCT = mss.mss()
+        raw = _SCT.grab({'left': x, 'top': y, 'width': width, 'height': height})
+        return Image.frombytes('RGB', raw.size, raw.bgra, 'raw', 'BGRX')
+
+    @staticmethod
+    def capture_window(x, y, width, height):
+        """
+        Capture the given window region and return it as a PIL image (None on failure).
+        Encoding is left to the caller so it can run off the capture loop (see _save_image).
         """
         try:
+            if mss is not None:
+                return WindowCapture._grab_region(x, y, width, height)
             if not pyautogui:
                 logger.error("pyautogui is required for capturing")
-                return False
-            screenshot = pyautogui.screenshot(region=(x, y, width, height))
-            screenshot.save(output_path)
-            logger.info(f"Captured window saved: {output_path}")
-            return True
+                return None
+            return pyautogui.screenshot(region=(x, y, width, height))
         except Exception as e:
             logger.error(f"Capture failed: {str(e)}")
-            return False
+            return None
 
     @staticmethod
     def capture_fullscreen(output_path):
@@ -194,37 +229,116 @@ class WindowCapture:
             logger.error(f"Capture failed: {str(e)}")
             return False
 
+def _compiled_script(name, source):
+    """
+    Compile AppleScript source once with osacompile and return the .scpt path (None if compiling fails).
+    The file name carries a hash of the source, so an edited script never reuses a stale compiled copy.
+    """
+    if name in _COMPILED_SCRIPTS:
+        return _COMPILED_SCRIPTS[name]
+    digest = hashlib.sha1(source.encode('utf-8')).hexdigest()[:10]
+    path = SCRIPT_CACHE_DIR / f"{name}-{digest}.scpt"
+    if not path.exists():
+        try:
+            SCRIPT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.stem}.tmp{path.suffix}")
+            result = subprocess.run(['osacompile', '-o', str(tmp_path), '-e', source], capture_output=True, text=True, timeout=15)
+            if result.returncode != 0:
+                logger.warning(f"osacompile failed for {name}: {result.stderr}")
+                path = None
+            else:
+                os.replace(tmp_path, path)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"osacompile failed for {name}: {e}")
+            path = None
+    _COMPILED_SCRIPTS[name] = path
+    return path
+
+def _run_applescript(name, source, *args, timeout=None):
+    """
+    Run AppleScript with argv, from its compiled .scpt when available so osascript skips parsing the source.
+    """
+    path = _compiled_script(name, source)
+    cmd = ['osascript', str(path), *args] if path else ['osascript', '-e', source, *args]
+    return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+
+def _save_image(data, mode, size, path, image_format):
+    """
+    Rebuild a captured page from its raw pixels and encode it to path.
+    Runs in a worker process so encodes of consecutive pages proceed in parallel on separate cores.
+    """
+    img = Image.frombytes(mode, size, data)
+    if image_format == 'jpg' and img.mode != 'RGB':
+        img = img.convert('RGB')
+    img.save(path, **SAVE_OPTIONS[image_format])
+    return path
+
+def _log_saves(futures):
+    for future in futures:
+        try:
+            logger.info(f"Captured window saved: {future.result()}")
+        except Exception as e:
+            logger.error(f"Save failed: {e}")
+
 def resize_window(app_name, win_name, width, height):
-    script = f'''
-    tell application "System Events"
-        set proc to first process whose name is "{app_name}"
-        set win to first window of proc whose name is "{win_name}"
-        set size of win to {{{width}, {height}}}
-    end tell
+    script = '''
+    on run argv
+        tell application "System Events"
+            set proc to first process whose name is (item 1 of argv)
+            set win to first window of proc whose name is (item 2 of argv)
+            set size of win to {(item 3 of argv) as integer, (item 4 of argv) as integer}
+        end tell
+    end run
     '''
-    result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True)
+    result = _run_applescript('resize_window', script, app_name, win_name, str(width), str(height))
+    # Window geometry changed, so the cached enumeration is stale.
+    _WINDOW_CACHE['data'] = None
     if result.returncode != 0:
         logger.error(f"Resize failed: {result.stderr}")
 
-def activate_app(app_name):
+class OsaSession(AppleScriptSession):
+    """
+    shot.AppleScriptSession started on construction, with send() as this script's name for run().
+    The page loop activates the app and sends a key for every page; reusing one process avoids an osascript launch per call.
+    """
+    def __init__(self):
+        super().__init__()
+        self._start()
+
+    send = AppleScriptSession.run
+
+def activate_app(app_name, osa=None):
     """
     Activate the given app using AppleScript (bring to foreground).
     """
     try:
-        script = f'tell application "{app_name}" to activate'
-        subprocess.run(['osascript', '-e', script], capture_output=True, timeout=5)
+        if osa is not None:
+            osa.send(f'tell application "{app_name}" to activate', timeout=5)
+        else:
+            script = '''
+            on run argv
+                tell application (item 1 of argv) to activate
+            end run
+            '''
+            _run_applescript('activate_app', script, app_name, timeout=5)
         logger.info(f"Activated app: {app_name}")
     except Exception as e:
         logger.warning(f"Failed to activate app {app_name}: {e}")
 
-def send_key_applescript(app_name, key):
-    script = f'''
-    tell application "{app_name}" to activate
-    tell application "System Events"
-        keystroke "{key}"
-    end tell
+def send_key_applescript(app_name, key, osa=None):
+    if osa is not None:
+        osa.send(f'tell application "{app_name}" to activate')
+        osa.send(f'tell application "System Events" to keystroke "{key}"')
+        return
+    script = '''
+    on run argv
+        tell application (item 1 of argv) to activate
+        tell application "System Events"
+            keystroke (item 2 of argv)
+        end tell
+    end run
     '''
-    subprocess.run(['osascript', '-e', script])
+    _run_applescript('send_key', script, app_name, key)
 
 def main():
     parser = argparse.ArgumentParser(description='macOS Window Capture Tool (PNG, batch, margin, resize)')
@@ -242,6 +356,7 @@ def main():
     parser.add_argument('--bottom', '-B', default =45, type=int, help='캡처 영역 하단 마진 (pixels)')
     parser.add_argument('--left', '-l', default = 0, type=int, help='캡처 영역 왼쪽 마진 (pixels)')
     parser.add_argument('--right', '-R', default = 0, type=int, help='캡처 영역 오른쪽 마진 (pixels)')
+    parser.add_argument('--image-format', default='png', choices=sorted(SAVE_OPTIONS), help='저장 이미지 형식 (default: png)')
 
     args = parser.parse_args()
     logger.setLevel(logging.INFO)
@@ -267,33 +382,54 @@ def main():
         resize_window(proc_name, win_name, w, args.height)
         h = args.height
 
-    for i in range(args.no):
-        current_page_num = args.start + i
-        output_path_page = output_dir / f'{current_page_num:04d}.png'
-
-        # 마진 적용
-        capture_x = x + args.left
-        capture_y = y + args.top
-        capture_width = w - args.left - args.right
-        capture_height = h - args.top - args.bottom
-
-        if capture_width <= 0 or capture_height <= 0:
-            logger.error(f"Invalid capture area for page {current_page_num}. Check margin values.")
-            sys.exit(1)
-
-        activate_app(proc_name)
-        logger.info(f"Capturing page {current_page_num}...")
-        WindowCapture.capture_window(capture_x, capture_y, capture_width, capture_height, str(output_path_page))
-
-        # 다음 페이지 넘김
-        if i < args.no - 1 and args.next:
-            try:
-                send_key_applescript(proc_name, args.next)
-            except Exception as e:
-                logger.warning(f"Next page action failed: {e}")
-            if args.delay > 0:
-                import time
-                time.sleep(args.delay)
+    # Captured pages are encoded in worker processes; capping in-flight saves bounds how many images wait in memory.
+    workers = min(4, os.cpu_count() or 1)
+    pool = ProcessPoolExecutor(max_workers=workers)
+    pending = set()
+
+    # One osascript process serves every activate/keystroke in the loop.
+    try:
+        osa = OsaSession()
+    except OSError as e:
+        logger.warning(f"Could not start osascript session, falling back to one process per call: {e}")
+        osa = None
+    try:
+        for i in range(args.no):
+            current_page_num = args.start + i
+            output_path_page = output_dir / f'{current_page_num:04d}.{args.image_format}'
+
+            # 마진 적용
+            capture_x = x + args.left
+            capture_y = y + args.top
+            capture_width = w - args.left - args.right
+            capture_height = h - args.top - args.bottom
+
+            if capture_width <= 0 or capture_height <= 0:
+                logger.error(f"Invalid capture area for page {current_page_num}. Check margin values.")
+                sys.exit(1)
+
+            activate_app(proc_name, osa)
+            logger.info(f"Capturing page {current_page_num}...")
+            img = WindowCapture.capture_window(capture_x, capture_y, capture_width, capture_height)
+            if img is not None:
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    _log_saves(done)
+                pending.add(pool.submit(_save_image, img.tobytes(), img.mode, img.size, str(output_path_page), args.image_format))
+
+            # 다음 페이지 넘김
+            if i < args.no - 1 and args.next:
+                try:
+                    send_key_applescript(proc_name, args.next, osa)
+                except Exception as e:
+                    logger.warning(f"Next page action failed: {e}")
+                if args.delay > 0:
+                    time.sleep(args.delay)
+    finally:
+        if osa is not None:
+            osa.close()
+        _log_saves(wait(pending).done)
+        pool.shutdown()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,24 +1,49 @@
 import os
 import re
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 
 # 파일명에서 book, page, ext 추출용 정규식
 FILENAME_RE = re.compile(r'^(?P<book>.+)_(?P<page>\d+)\.(?P<ext>[^.]+)$')
 
-def zero_pad_filenames(directory, padding):
-    for fname in os.listdir(directory):
-        match = FILENAME_RE.match(fname)
-        if match:
-            book = match.group('book')
-            page = match.group('page')
-            ext = match.group('ext')
-            new_page = page.zfill(padding)
-            new_fname = f"{book}_{new_page}.{ext}"
-            if fname != new_fname:
-                src = os.path.join(directory, fname)
-                dst = os.path.join(directory, new_fname)
-                print(f"Renaming: {fname} -> {new_fname}")
-                os.rename(src, dst)
+def zero_pad_filenames(directory, padding, max_workers=8):
+    names = set()
+    pairs = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            fname = entry.name
+            names.add(fname)
+            # 이미 padding 자리수로 맞춰진 파일은 정규식 없이 바로 건너뜀
+            underscore = fname.rfind('_')
+            dot = fname.rfind('.')
+            if underscore != -1 and dot - underscore - 1 == padding and fname[underscore + 1:dot].isdigit():
+                continue
+            match = FILENAME_RE.match(fname)
+            if match:
+                book = match.group('book')
+                page = match.group('page')
+                ext = match.group('ext')
+                new_page = page.zfill(padding)
+                new_fname = f"{book}_{new_page}.{ext}"
+                if fname != new_fname:
+                    pairs.append((entry.path, new_fname))
+    # 병렬 rename 전에 덮어쓰기가 될 수 있는 항목(기존 파일 또는 같은 대상 이름)을 제외
+    targets = {}
+    for src, new_fname in pairs:
+        targets.setdefault(new_fname, []).append(src)
+    # 디렉토리 경로(구분자 포함)는 한 번만 만들고 루프에서는 문자열 결합만 수행
+    prefix = os.path.join(directory, '')
+    renames = []
+    for new_fname, srcs in targets.items():
+        if new_fname in names or len(srcs) > 1:
+            for src in srcs:
+                print(f"Skipping: {os.path.basename(src)} -> {new_fname} (target exists)")
+            continue
+        renames.append((srcs[0], prefix + new_fname))
+    # rename은 파일시스템 메타데이터 I/O이므로 스레드 풀로 겹쳐 실행
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        list(ex.map(lambda pair: os.rename(*pair), renames))
+    print(f"Renamed {len(renames)} file(s) in {directory}")
 
 def main():
     parser = argparse.ArgumentParser(description="Zero-pad page numbers in filenames like {book}_{page}.ext")
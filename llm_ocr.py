@@ -3,16 +3,43 @@
 llm_ocr.py: PNG → Mistral OCR 텍스트 추출 및 병합
 """
 import os
+import re
 import sys
 import argparse
 from pathlib import Path
 import requests
+from requests.adapters import HTTPAdapter
 import base64
+import io
+import hashlib
+import shutil
+import subprocess
+import sqlite3
 from dotenv import load_dotenv
 import time
-from filelock import FileLock
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 
+# orjson이 있으면 요청 본문 직렬화/응답 파싱에 사용 (없으면 requests의 표준 json)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# httpx(+h2)가 있으면 HTTP/2 클라이언트 하나로 모든 작업 스레드의 요청을 다중화
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# blake3가 있으면 캐시 키 해시에 사용 (없으면 hashlib.blake2b)
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
 # Logger 설정 (한/영)
 logger = logging.getLogger('llm_ocr')
 ch = logging.StreamHandler()
@@ -24,6 +51,186 @@ if not logger.hasHandlers():
 load_dotenv()
 MISTRAL_API_KEY = os.getenv("MISTRAL_API_KEY", "")
 MISTRAL_OCR_MODEL = "mistral-ocr-latest"
+MISTRAL_API_BASE = "https://api.mistral.ai/v1"
+# 지원하는 이미지 확장자 → data URL MIME 타입
+_MIME = {'.png': 'image/png', '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.webp': 'image/webp'}
+# 이 크기 이상의 이미지는 base64 data URL 대신 파일 업로드(multipart)로 보냄 (요청 본문 33% 절약)
+# 작은 이미지는 업로드/URL 발급 왕복이 더 비싸므로 data URL 유지
+UPLOAD_THRESHOLD = 4 * 1024 * 1024
+# 동시에 보낼 OCR 요청 수 (API 지연을 겹쳐서 숨김)
+DEFAULT_MAX_CONCURRENCY = 6
+# --preprocess: 긴 변 최대 픽셀, JPEG 품질 (업로드 크기를 크게 줄임)
+PREPROCESS_MAX_EDGE = 2048
+PREPROCESS_QUALITY = 85
+# 로컬 Tesseract 단계(--fallback-threshold)에서 쓰는 언어
+DEFAULT_TESS_LANG = 'kor+eng'
+# 429/5xx 응답 시 페이지당 최대 시도 횟수, Retry-After가 없을 때 쉬는 시간(초)
+MAX_ATTEMPTS = 5
+# 같은 Idempotency-Key로 다시 보내는 일시적 오류 응답
+RETRY_STATUS = {429, 502, 503, 504}
+DEFAULT_BACKOFF = 2.0
+# (연결, 응답) 타임아웃 초. 없으면 응답이 멈췄을 때 영원히 기다림
+REQUEST_TIMEOUT = (5, 60)
+
+# 모든 요청에 공통인 헤더는 한 번만 만들어 세션/클라이언트에 붙여 둠
+_BASE_HEADERS = {"Authorization": f"Bearer {MISTRAL_API_KEY}"}
+
+# 요청마다 TCP/TLS 연결을 새로 맺지 않도록 keep-alive 세션과 연결 풀을 재사용
+SESSION = requests.Session()
+SESSION.headers.update(_BASE_HEADERS)
+
+def _mount_pool(pool_size):
+    # 재시도는 Limiter가 담당하므로 어댑터 자체 재시도는 끔
+    SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0))
+
+_mount_pool(DEFAULT_MAX_CONCURRENCY)
+
+def _make_http2_client():
+    if httpx is None:
+        return None
+    try:
+        return httpx.Client(
+            http2=True,
+            headers=_BASE_HEADERS,
+            timeout=httpx.Timeout(REQUEST_TIMEOUT[1], connect=REQUEST_TIMEOUT[0]),
+            limits=httpx.Limits(max_connections=32),
+        )
+    except ImportError:
+        # http2=True에는 h2 패키지가 필요함. 없으면 requests 세션 사용
+        return None
+
+# HTTP/2에서는 여러 스레드의 요청이 TCP+TLS 연결 하나를 함께 씀 (연결 풀 불필요)
+HTTP2_CLIENT = _make_http2_client()
+HTTP_ERRORS = (requests.RequestException,) + ((httpx.HTTPError,) if httpx is not None else ())
+
+def _request(method, url, content=None, **kwargs):
+    """
+    HTTP/2 클라이언트가 있으면 그것으로, 없으면 requests 세션으로 요청합니다.
+    files/data/params/headers/json 인자는 두 라이브러리에서 같은 의미로 전달됩니다.
+    """
+    if HTTP2_CLIENT is not None:
+        return HTTP2_CLIENT.request(method, url, content=content, **kwargs)
+    # requests는 원시 본문도 data로 받으므로, multipart 폼 필드(data=...)와 겹치지 않을 때만 넘김
+    if content is not None:
+        kwargs['data'] = content
+    return SESSION.request(method, url, timeout=REQUEST_TIMEOUT, **kwargs)
+
+class Limiter:
+    """
+    AIMD 방식으로 동시 요청 수를 조절합니다.
+    Additive-increase / multiplicative-decrease concurrency control:
+    성공하면 alpha만큼 늘리고, 429/5xx면 beta배로 줄인 뒤 Retry-After 동안 새 요청을 멈춥니다.
+    """
+    def __init__(self, max_concurrency=DEFAULT_MAX_CONCURRENCY, alpha=0.5, beta=0.5):
+        self.max_concurrency = max(1, max_concurrency)
+        self.concurrency = float(self.max_concurrency)
+        self.alpha = alpha
+        self.beta = beta
+        self._active = 0
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def __enter__(self):
+        with self._cond:
+            while True:
+                wait = self._paused_until - time.monotonic()
+                if wait > 0:
+                    self._cond.wait(wait)
+                elif self._active < int(self.concurrency):
+                    break
+                else:
+                    self._cond.wait()
+            self._active += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        with self._cond:
+            self.concurrency = min(self.max_concurrency, self.concurrency + self.alpha)
+            self._cond.notify_all()
+
+    def on_throttle(self, retry_after=None):
+        with self._cond:
+            self.concurrency = max(1.0, self.concurrency * self.beta)
+            pause = retry_after if retry_after is not None else DEFAULT_BACKOFF
+            self._paused_until = max(self._paused_until, time.monotonic() + pause)
+        logger.debug(f"Throttled: concurrency={self.concurrency:.1f}, pause={pause}s")
+
+# 단일 파일 처리(process_file) 호출들이 함께 쓰는 limiter
+_SHARED_LIMITER = Limiter()
+
+_DIGITS_RE = re.compile(r'(\d+)')
+
+def _natural_key(name):
+    """
+    page2 < page10 순서가 되도록 숫자 부분은 정수로 비교하는 정렬 키
+    """
+    return [int(part) if part.isdigit() else part for part in _DIGITS_RE.split(name)]
+
+def _retry_after(response):
+    """
+    Retry-After 헤더(초 단위)를 읽습니다. 없거나 해석할 수 없으면 None.
+    """
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+# 이미지 내용 해시 → OCR 결과 캐시 (같은 이미지를 다시 실행해도 API를 호출하지 않음)
+CACHE_PATH = Path.home() / '.cache' / 'capture_mac' / 'ocr.sqlite'
+_cache_conn = None
+_cache_lock = threading.Lock()
+
+def _cache():
+    global _cache_conn
+    if _cache_conn is None:
+        try:
+            CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(CACHE_PATH), timeout=30, check_same_thread=False)
+            # WAL: 여러 프로세스가 동시에 읽고 써도 서로 막지 않음
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS ocr (key TEXT PRIMARY KEY, text TEXT NOT NULL)')
+            conn.commit()
+            _cache_conn = conn
+        except sqlite3.Error as e:
+            logger.warning(f"OCR cache disabled: {e}")
+            _cache_conn = False
+    return _cache_conn
+
+def _digest(raw):
+    return blake3(raw).hexdigest() if blake3 is not None else hashlib.blake2b(raw, digest_size=32).hexdigest()
+
+def content_key(raw, model=MISTRAL_OCR_MODEL):
+    """
+    이미지 바이트와 모델 이름으로 캐시 키를 만듭니다.
+    Cache key for the given image bytes and OCR model.
+    """
+    return f"{_digest(raw)}:{model}"
+
+def cache_get(key):
+    with _cache_lock:
+        conn = _cache()
+        if not conn:
+            return None
+        row = conn.execute('SELECT text FROM ocr WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else None
+
+def cache_put(key, text):
+    with _cache_lock:
+        conn = _cache()
+        if not conn:
+            return
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO ocr (key, text) VALUES (?, ?)', (key, text))
+
+def _b64(raw):
+    # base64 결과는 항상 ASCII이므로 utf-8 대신 ascii로 디코딩 (더 빠름)
+    return base64.b64encode(raw).decode('ascii')
 
 def encode_file(file_path):
     """
@@ -31,49 +238,286 @@ def encode_file(file_path):
     Encode file as base64 string.
     """
     with open(file_path, "rb") as file:
-        return base64.b64encode(file.read()).decode('utf-8')
+        return _b64(file.read())
+
+def preprocess_image(raw, max_edge=PREPROCESS_MAX_EDGE, quality=PREPROCESS_QUALITY):
+    """
+    업로드 전에 이미지를 흑백으로 바꾸고 긴 변을 max_edge 이하로 줄여 JPEG로 인코딩합니다.
+    Downscale to grayscale JPEG before upload.
+    """
+    from PIL import Image
+    with Image.open(io.BytesIO(raw)) as img:
+        # 채널을 먼저 1개로 줄여 리사이즈 비용도 낮춤
+        img = img.convert('L')
+        img.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+        buf = io.BytesIO()
+        img.save(buf, 'JPEG', quality=quality, optimize=True)
+    return buf.getvalue()
+
+def _upload_for_ocr(file_name, raw):
+    """
+    이미지를 multipart로 업로드하고 OCR 요청에 쓸 서명된 URL을 받습니다.
+    Upload the image via the files API and return (file_id, signed_url).
+    """
+    response = _request(
+        "POST",
+        f"{MISTRAL_API_BASE}/files",
+        files={"file": (file_name, raw)},
+        data={"purpose": "ocr"}
+    )
+    response.raise_for_status()
+    file_id = response.json()["id"]
+    try:
+        response = _request("GET", f"{MISTRAL_API_BASE}/files/{file_id}/url", params={"expiry": 1})
+        response.raise_for_status()
+        return file_id, response.json()["url"]
+    except Exception:
+        # 호출자는 file_id를 받기 전이므로 여기서 지우지 않으면 업로드 파일이 계정에 계속 남음
+        _delete_upload(file_id)
+        raise
+
+def _delete_upload(file_id):
+    try:
+        _request("DELETE", f"{MISTRAL_API_BASE}/files/{file_id}")
+    except HTTP_ERRORS as e:
+        logger.debug(f"Failed to delete uploaded file {file_id}: {e}")
 
-def perform_mistral_ocr(file_path):
+def perform_mistral_ocr(file_path, limiter=None, preprocess=False):
     """
     Mistral API를 호출하여 OCR을 수행합니다.
     Perform OCR using Mistral API.
+    limiter가 주어지면 요청 슬롯을 얻은 뒤 보내고, 응답 결과를 limiter에 알립니다.
+    preprocess가 참이면 흑백 JPEG로 축소해서 보냅니다.
     """
+    file_path = Path(file_path)
+    with open(file_path, "rb") as file:
+        raw = file.read()
+    key = content_key(raw, f"{MISTRAL_OCR_MODEL}:pre" if preprocess else MISTRAL_OCR_MODEL)
+    cached = cache_get(key)
+    if cached is not None:
+        logger.debug(f"Cache hit: {file_path}")
+        return cached
     if not MISTRAL_API_KEY:
         logger.error("MISTRAL_API_KEY not set")
         return None
-    ext = file_path.suffix.lower()
-    base64_file = encode_file(file_path)
-    mime_type = f"image/{ext[1:]}" if ext != '.jpg' else "image/jpeg"
-    data_url = f"data:{mime_type};base64,{base64_file}"
+    # 같은 이미지는 항상 같은 키 → 타임아웃/연결 끊김 후 재시도해도 서버에서 중복 처리(과금)되지 않음
     headers = {
+        "Idempotency-Key": hashlib.blake2b(key.encode(), digest_size=16).hexdigest(),
         "Content-Type": "application/json",
-        "Authorization": f"Bearer {MISTRAL_API_KEY}"
-    }
-    data = {
-        "model": MISTRAL_OCR_MODEL,
-        "document": {
-            "type": "image_url",
-            "image_url": data_url
-        }
     }
-    response = requests.post(
-        "https://api.mistral.ai/v1/ocr",
-        headers=headers,
-        json=data
-    )
+    file_name = file_path.name
+    if preprocess:
+        raw = preprocess_image(raw)
+        file_name = file_path.stem + ".jpg"
+    mime_type = _MIME.get(Path(file_name).suffix.lower())
+    if mime_type is None:
+        logger.error(f"Unsupported image type: {file_path}")
+        return None
+    file_id = None
+    try:
+        with limiter if limiter is not None else nullcontext():
+            if len(raw) >= UPLOAD_THRESHOLD:
+                file_id, image_url = _upload_for_ocr(file_name, raw)
+            else:
+                image_url = f"data:{mime_type};base64,{_b64(raw)}"
+            del raw
+            data = {
+                "model": MISTRAL_OCR_MODEL,
+                "document": {
+                    "type": "image_url",
+                    "image_url": image_url
+                }
+            }
+            if orjson is not None:
+                # base64 data URL 때문에 본문이 크므로 직렬화 비용이 큼
+                response = _request(
+                    "POST",
+                    f"{MISTRAL_API_BASE}/ocr",
+                    content=orjson.dumps(data),
+                    headers=headers
+                )
+            else:
+                response = _request(
+                    "POST",
+                    f"{MISTRAL_API_BASE}/ocr",
+                    json=data,
+                    headers=headers
+                )
+    except HTTP_ERRORS as e:
+        # 응답이 없는 오류(타임아웃/연결 끊김)와 업로드 단계의 일시적 오류 응답(RETRY_STATUS)만 rate limit과 같이 재시도.
+        # 그 밖의 오류 응답(400/401/413 등)은 다시 보내도 같으므로 /ocr 오류와 마찬가지로 실패 처리
+        response = getattr(e, 'response', None)
+        if response is not None and response.status_code not in RETRY_STATUS:
+            logger.error(f"Mistral upload API error: {response.status_code} - {file_path}")
+            return None
+        logger.warning(f"Mistral OCR request failed: {file_path} - {e}")
+        if limiter is not None:
+            limiter.on_throttle(_retry_after(response) if response is not None else None)
+        return "RATE_LIMIT"
+    finally:
+        if file_id is not None:
+            _delete_upload(file_id)
+    if limiter is not None:
+        if response.status_code in RETRY_STATUS:
+            limiter.on_throttle(_retry_after(response))
+        elif response.status_code == 200:
+            limiter.on_success()
     if response.status_code == 200:
-        ocr_result = response.json()
+        ocr_result = orjson.loads(response.content) if orjson is not None else response.json()
         all_text = ""
         for page in ocr_result.get("pages", []):
             all_text += page.get("markdown", "") + "\n\n"
-        return all_text.strip()
-    elif response.status_code == 429:
-        logger.warning(f"Rate limit error: {file_path}")
+        all_text = all_text.strip()
+        cache_put(key, all_text)
+        return all_text
+    elif response.status_code in RETRY_STATUS:
+        # _ocr_with_retry가 같은 Idempotency-Key로 다시 보냄
+        logger.warning(f"Rate limit / temporary error {response.status_code}: {file_path}")
         return "RATE_LIMIT"
     else:
         logger.error(f"Mistral OCR API error: {response.status_code} - {response.text}")
         return None
 
+def tesseract_probe(file_path, lang=DEFAULT_TESS_LANG, tess_path='tesseract'):
+    """
+    Tesseract로 로컬 OCR을 수행하고 (텍스트, 평균 단어 신뢰도)를 반환합니다.
+    Run Tesseract locally and return (text, mean word confidence 0-100).
+    결과는 이미지 해시로 캐시하여 재실행 시 다시 돌리지 않습니다.
+    """
+    with open(file_path, "rb") as file:
+        key = content_key(file.read(), f"tesseract:{lang}")
+    cached = cache_get(key)
+    if cached is not None:
+        conf, _, text = cached.partition('\n')
+        return text, float(conf)
+    result = subprocess.run(
+        [tess_path, str(file_path), 'stdout', '-l', lang, 'tsv'],
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True
+    )
+    # TSV 열: level page block par line word left top width height conf text
+    lines = {}
+    confs = []
+    for row in result.stdout.decode('utf-8', errors='replace').splitlines()[1:]:
+        cols = row.split('\t')
+        if len(cols) < 12 or cols[0] != '5' or not cols[11].strip():
+            continue
+        confs.append(float(cols[10]))
+        lines.setdefault((cols[2], cols[3], cols[4]), []).append(cols[11])
+    text = '\n'.join(' '.join(words) for words in lines.values())
+    conf = sum(confs) / len(confs) if confs else 0.0
+    cache_put(key, f"{conf:.1f}\n{text}")
+    return text, conf
+
+def _ocr_page(file_path, limiter, fallback_threshold=None, lang=DEFAULT_TESS_LANG, tess_path='tesseract', preprocess=False):
+    """
+    fallback_threshold가 주어지면 먼저 Tesseract로 읽고, 평균 신뢰도가 그 이상이면 API를 호출하지 않습니다.
+    """
+    if fallback_threshold is not None:
+        try:
+            text, conf = tesseract_probe(file_path, lang, tess_path)
+        except (OSError, subprocess.CalledProcessError) as e:
+            logger.warning(f"Tesseract probe failed: {file_path} - {e}")
+        else:
+            if conf >= fallback_threshold and text:
+                logger.info(f"Tesseract 결과 사용 (conf {conf:.1f}): {file_path}")
+                return text
+            logger.debug(f"Low Tesseract confidence ({conf:.1f}), using Mistral: {file_path}")
+    return _ocr_with_retry(file_path, limiter, preprocess=preprocess)
+
+def _ocr_with_retry(file_path, limiter, attempts=MAX_ATTEMPTS, preprocess=False):
+    """
+    Rate limit이면 limiter가 정한 만큼 기다렸다가 다시 시도합니다.
+    """
+    for _ in range(attempts):
+        text = perform_mistral_ocr(file_path, limiter, preprocess)
+        if text != "RATE_LIMIT":
+            return text
+    return "RATE_LIMIT"
+
+def _write_text(path, text):
+    """
+    텍스트를 임시 파일에 바이트로 쓴 뒤 이름을 바꿔 저장합니다.
+    중간에 중단되어도 반쯤 쓰인 .txt가 남지 않으므로 재실행 시 '이미 존재'로 잘못 건너뛰지 않습니다.
+    """
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        f.write(text.encode('utf-8'))
+    os.replace(tmp_path, path)
+
+def process_file(input_path, output_path=None, fallback_threshold=None, lang=DEFAULT_TESS_LANG, tess_path='tesseract',
+                 preprocess=False):
+    """
+    PNG 한 장을 OCR하여 텍스트로 저장합니다. (GUI 등에서 모듈로 직접 호출)
+    OCR a single PNG and save the text next to it.
+    """
+    input_path = Path(input_path)
+    output_path = Path(output_path) if output_path else input_path.with_suffix('.txt')
+    text = _ocr_page(input_path, _SHARED_LIMITER, fallback_threshold, lang, tess_path, preprocess)
+    if text and text != "RATE_LIMIT":
+        _write_text(output_path, text)
+        logger.info(f"텍스트 저장: {output_path}")
+        return output_path
+    return None
+
+def process_directory(input_dir, output_dir=None, merge=False, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                      fallback_threshold=None, lang=DEFAULT_TESS_LANG, tess_path='tesseract', preprocess=False):
+    """
+    디렉토리의 모든 PNG를 OCR하고, 필요하면 텍스트를 병합합니다.
+    OCR every PNG in a directory and optionally merge the texts.
+    요청은 최대 max_concurrency개까지 동시에 보냅니다.
+    fallback_threshold가 주어지면 Tesseract 신뢰도가 낮은 페이지만 API로 보냅니다.
+    """
+    input_dir = Path(input_dir)
+    output_dir = Path(output_dir) if output_dir else input_dir
+    output_dir.mkdir(exist_ok=True)
+    # 디렉토리를 한 번씩만 나열하고, 이미 처리된 페이지는 파일마다 stat하지 않고 집합으로 확인
+    with os.scandir(input_dir) as it:
+        png_names = [e.name for e in it if e.name.endswith('.png') and e.is_file()]
+    with os.scandir(output_dir) as it:
+        done_stems = {e.name[:-4] for e in it if e.name.endswith('.txt')}
+    tasks = []
+    for name in sorted(png_names, key=_natural_key):
+        stem = name[:-4]
+        txt_path = output_dir / (stem + '.txt')
+        if stem in done_stems:
+            logger.info(f"이미 존재: {txt_path} → 건너뜀")
+            continue
+        tasks.append((input_dir / name, txt_path))
+    txt_files = []
+    limiter = Limiter(max_concurrency)
+    if limiter.max_concurrency > DEFAULT_MAX_CONCURRENCY:
+        _mount_pool(limiter.max_concurrency)
+    # 스레드 풀은 최대치만 정하고, 실제 동시 요청 수는 limiter가 응답에 따라 조절
+    with ThreadPoolExecutor(max_workers=limiter.max_concurrency) as executor:
+        futures = {
+            executor.submit(_ocr_page, png, limiter, fallback_threshold, lang, tess_path, preprocess): (png, txt_path)
+            for png, txt_path in tasks
+        }
+        for future in as_completed(futures):
+            png, txt_path = futures[future]
+            text = future.result()
+            if text == "RATE_LIMIT":
+                logger.error(f"재시도 실패: {png}")
+            elif text:
+                # 쓰기는 응답을 모으는 이 스레드에서 하므로 요청 작업자는 바로 다음 페이지로 넘어감
+                _write_text(txt_path, text)
+                txt_files.append(txt_path)
+                logger.info(f"텍스트 저장: {txt_path}")
+    if merge:
+        # 병합 목록은 위에서 나열한 기존 텍스트 + 이번에 저장한 텍스트로 구성 (다시 glob하지 않음)
+        merged_path = output_dir / f"{input_dir.name}_merged.txt"
+        merge_stems = (done_stems | {txt.stem for txt in txt_files}) - {merged_path.stem}
+        all_txts = [output_dir / (stem + '.txt') for stem in sorted(merge_stems, key=_natural_key)]
+        if all_txts:
+            # 페이지 텍스트는 저장할 때 이미 strip되어 있으므로 디코딩/복사 없이 바이트 그대로 이어 붙임
+            with open(merged_path, 'wb') as f:
+                for txt in all_txts:
+                    with open(txt, 'rb') as tf:
+                        shutil.copyfileobj(tf, f, 1 << 20)
+                    f.write(b'\n\n')
+            logger.info(f"병합 텍스트 저장: {merged_path}")
+    return sorted(txt_files)
+
 def main():
     parser = argparse.ArgumentParser(description='PNG → Mistral OCR 텍스트 추출 및 병합\nExtract text from PNG using Mistral OCR and merge.',
         formatter_class=argparse.RawDescriptionHelpFormatter)
@@ -82,7 +526,13 @@ def main():
     parser.add_argument('--output-file', '-of', help='출력 파일 (Output file)')
     parser.add_argument('--output-dir', '-od', help='출력 디렉토리 (Output directory)')
     parser.add_argument('--merge', '-m', action='store_true', help='결과 병합 (Merge outputs)')
-    parser.add_argument('--lang', '-l', default='kor+eng', help='(미사용, 호환성용 / Not used, for compatibility)')
+    parser.add_argument('--max-concurrency', type=int, default=DEFAULT_MAX_CONCURRENCY, help='동시 OCR 요청 수 (Max concurrent OCR requests)')
+    parser.add_argument('--lang', '-l', default=DEFAULT_TESS_LANG, help='--fallback-threshold 사용 시 Tesseract 언어 (Tesseract language for the local tier)')
+    parser.add_argument('--tess', default='tesseract', help='Tesseract 실행 경로 (Tesseract path)')
+    parser.add_argument('--preprocess', action='store_true',
+        help=f'업로드 전 흑백 JPEG로 축소 (긴 변 {PREPROCESS_MAX_EDGE}px) (Downscale to grayscale JPEG before upload)')
+    parser.add_argument('--fallback-threshold', type=float, default=None,
+        help='먼저 Tesseract로 읽고 평균 신뢰도(0-100)가 이 값 미만인 페이지만 Mistral로 보냄 (Use local Tesseract first; call Mistral only below this confidence)')
     parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], help='로그 레벨 (Log level)')
     args = parser.parse_args()
     # Logger 레벨 설정
@@ -91,61 +541,13 @@ def main():
     ch.setLevel(log_level)
 
     if args.input_file:
-        input_path = Path(args.input_file)
-        output_path = Path(args.output_file) if args.output_file else input_path.with_suffix('.txt')
-        text = perform_mistral_ocr(input_path)
-        if text:
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(text)
-            logger.info(f"텍스트 저장: {output_path}")
+        process_file(args.input_file, args.output_file, args.fallback_threshold, args.lang, args.tess, args.preprocess)
         return
 
     if args.input_dir:
-        input_dir = Path(args.input_dir)
-        output_dir = Path(args.output_dir) if args.output_dir else input_dir
-        output_dir.mkdir(exist_ok=True)
-        png_files = sorted(input_dir.glob('*.png'))
-        txt_files = []
-        lock = FileLock("/tmp/mistral_api.lock")
-        retry_list = []
-        for png in png_files:
-            txt_path = output_dir / (png.stem + '.txt')
-            if txt_path.exists():
-                logger.info(f"이미 존재: {txt_path} → 건너뜀")
-                continue
-            with lock:
-                text = perform_mistral_ocr(png)
-            if text == "RATE_LIMIT":
-                retry_list.append(png)
-            elif text:
-                with open(txt_path, 'w', encoding='utf-8') as f:
-                    f.write(text)
-                txt_files.append(txt_path)
-                logger.info(f"텍스트 저장: {txt_path}")
-            time.sleep(0.2)
-        if retry_list:
-            logger.warning(f"Rate limit으로 실패한 파일 {len(retry_list)}개, 3초 후 재시도...")
-            time.sleep(3)
-            for png in retry_list:
-                txt_path = output_dir / (png.stem + '.txt')
-                with lock:
-                    text = perform_mistral_ocr(png)
-                if text and text != "RATE_LIMIT":
-                    with open(txt_path, 'w', encoding='utf-8') as f:
-                        f.write(text)
-                    txt_files.append(txt_path)
-                    logger.info(f"재시도 성공: {txt_path}")
-                else:
-                    logger.error(f"재시도 실패: {png}")
-        if args.merge:
-            all_txts = sorted(output_dir.glob('*.txt'), key=lambda x: str(x))
-            if all_txts:
-                merged_path = output_dir / f"{input_dir.name}_merged.txt"
-                with open(merged_path, 'w', encoding='utf-8') as f:
-                    for txt in all_txts:
-                        with open(txt, 'r', encoding='utf-8') as tf:
-                            f.write(tf.read().strip() + '\n\n')
-                logger.info(f"병합 텍스트 저장: {merged_path}")
+        process_directory(args.input_dir, args.output_dir, merge=args.merge, max_concurrency=args.max_concurrency,
+                          fallback_threshold=args.fallback_threshold, lang=args.lang, tess_path=args.tess,
+                          preprocess=args.preprocess)
         return
     logger.error("--input-file/-if 또는 --input-dir/-id 중 하나를 지정하세요.")
     sys.exit(1)
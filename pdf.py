@@ -2,13 +2,23 @@
 """
 pdf.py: PNG → Tesseract Searchable PDF 변환 및 병합
 """
+import io
 import os
+import re
 import sys
 import argparse
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import logging
 
+# pikepdf(qpdf)가 있으면 PDF 병합에 사용 (없으면 PyPDF2)
+try:
+    import pikepdf
+except ImportError:
+    pikepdf = None
+
 # Logger 설정 (한/영)
 logger = logging.getLogger('pdf')
 ch = logging.StreamHandler()
@@ -17,34 +27,190 @@ ch.setFormatter(formatter)
 if not logger.hasHandlers():
     logger.addHandler(ch)
 
+DEFAULT_LANG = 'kor+eng+chi_tra'
+# Tesseract 자체의 OpenMP 스레드를 1개로 제한 (여러 프로세스를 동시에 띄울 때 코어 과다 사용 방지)
+TESS_ENV = dict(os.environ, OMP_THREAD_LIMIT='1')
+# 한 번의 tesseract 실행(언어 모델 로드 1회)으로 처리할 최대 페이지 수
+BATCH_PAGES = 20
+# pikepdf 병합 시 동시에 열어 두는 최대 원본 PDF 수
+MERGE_BATCH = 200
+
+_DIGITS_RE = re.compile(r'(\d+)')
+
+def _natural_key(name):
+    """
+    page2 < page10 순서가 되도록 숫자 부분은 정수로 비교하는 정렬 키
+    """
+    return [int(part) if part.isdigit() else part for part in _DIGITS_RE.split(name)]
+
+def _list_ext(directory, exts):
+    """
+    디렉토리를 한 번만 나열하여 확장자(소문자 비교)가 exts에 속하는 파일을 정렬해 반환합니다.
+    """
+    directory = Path(directory)
+    with os.scandir(directory) as it:
+        names = [e.name for e in it if os.path.splitext(e.name)[1].lower() in exts]
+    return [directory / name for name in sorted(names, key=_natural_key)]
+
 def run_tesseract(input_path, output_path, lang, tess_path):
     """
     Tesseract를 이용해 PNG를 PDF로 변환합니다.
     Converts PNG to searchable PDF using Tesseract.
     """
     cmd = [tess_path, str(input_path), str(output_path.with_suffix('')), '-l', lang, 'pdf']
-    logger.info(f"Running: {' '.join(cmd)}")
-    subprocess.run(cmd, check=True)
+    _run_tess(cmd)
+    return output_path
+
+def run_tesseract_image(image, output_path, lang, tess_path):
+    """
+    메모리의 PIL 이미지를 BMP로 stdin에 넘겨 PDF로 변환합니다 (PNG 디코딩/디스크 읽기 없음).
+    Convert an in-memory PIL Image to a searchable PDF by piping it to Tesseract's stdin as BMP.
+    """
+    cmd = [tess_path, '-', str(output_path.with_suffix('')), '-l', lang, 'pdf']
+    # BMP는 압축이 없어 인코딩이 메모리 복사 수준
+    buf = io.BytesIO()
+    image.save(buf, format='BMP')
+    _run_tess(cmd, buf.getvalue())
     return output_path
 
+def _run_tess(cmd, stdin_data=None):
+    logger.info(f"Running: {' '.join(cmd)}")
+    # 동시에 여러 개를 실행하므로 출력이 섞이지 않게 stdout은 버리고 stderr는 실패 시에만 표시
+    result = subprocess.run(cmd, input=stdin_data, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, env=TESS_ENV)
+    if result.returncode != 0:
+        logger.error(result.stderr.decode('utf-8', errors='replace').strip())
+        result.check_returncode()
+
+def run_tesseract_batch(tasks, lang, tess_path):
+    """
+    여러 PNG를 tesseract 한 번으로 변환한 뒤(목록 파일 입력) 페이지별 PDF로 나눕니다.
+    Convert several PNGs in one tesseract run and split the result into per-page PDFs.
+    tasks: [(png_path, pdf_path), ...]
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        list_path = Path(tmp) / 'list.txt'
+        list_path.write_text(''.join(f"{png}\n" for png, _ in tasks), encoding='utf-8')
+        out_base = Path(tmp) / 'batch'
+        _run_tess([tess_path, str(list_path), str(out_base), '-l', lang, 'pdf'])
+        with pikepdf.open(out_base.with_suffix('.pdf')) as combined:
+            if len(combined.pages) != len(tasks):
+                # 여러 프레임 이미지 등으로 페이지 수가 어긋나면 페이지별 실행으로 처리
+                logger.warning(f"Batch page count mismatch ({len(combined.pages)} != {len(tasks)}), converting one by one")
+                for png, pdf_path in tasks:
+                    process_file(png, pdf_path, lang, tess_path)
+                return
+            for page, (_, pdf_path) in zip(combined.pages, tasks):
+                single = pikepdf.Pdf.new()
+                single.pages.append(page)
+                single.save(str(pdf_path))
+                single.close()
+                logger.info(f"PDF 저장: {pdf_path}")
+
+def _merge_pikepdf(pdf_files, merged_path):
+    """
+    qpdf(C++)가 페이지 객체를 그대로 복사하므로 콘텐츠 스트림을 파이썬에서 다시 해석하지 않음.
+    복사된 스트림은 저장할 때 원본에서 읽으므로 원본은 저장할 때까지 열어 두어야 함.
+    원본은 파일에서 필요한 부분만 읽히도록 경로로 열고, 파일 핸들 수 제한(macOS 기본 256)을 넘지 않도록
+    MERGE_BATCH개씩 임시 PDF로 병합한 뒤 그 결과를 다시 병합
+    """
+    if len(pdf_files) > MERGE_BATCH:
+        with tempfile.TemporaryDirectory() as tmp:
+            parts = []
+            for i in range(0, len(pdf_files), MERGE_BATCH):
+                part = Path(tmp) / f"part_{len(parts):05d}.pdf"
+                _merge_pikepdf(pdf_files[i:i + MERGE_BATCH], part)
+                parts.append(part)
+            _merge_pikepdf(parts, merged_path)
+        return
+    dst = pikepdf.Pdf.new()
+    sources = []
+    try:
+        for pdf in pdf_files:
+            src = pikepdf.open(str(pdf))
+            sources.append(src)
+            dst.pages.extend(src.pages)
+        dst.save(str(merged_path))
+    finally:
+        dst.close()
+        for src in sources:
+            src.close()
+
 def merge_pdfs(pdf_files, merged_path):
     """
     여러 PDF를 하나로 병합합니다.
     Merge multiple PDFs into one.
     """
+    pdf_files = sorted(pdf_files, key=lambda x: _natural_key(Path(x).name))
+    if pikepdf is not None:
+        _merge_pikepdf(pdf_files, merged_path)
+        logger.info(f"병합 PDF 저장: {merged_path}")
+        return
     try:
         from PyPDF2 import PdfMerger
     except ImportError:
-        logger.error("PyPDF2가 필요합니다. pip install PyPDF2")
-        sys.exit(1)
+        raise RuntimeError("pikepdf 또는 PyPDF2가 필요합니다. pip install pikepdf")
     merger = PdfMerger()
-    for pdf in sorted(pdf_files, key=lambda x: str(x)):
+    for pdf in pdf_files:
         with open(pdf, 'rb') as f:
             merger.append(f)
     merger.write(str(merged_path))
     merger.close()
     logger.info(f"병합 PDF 저장: {merged_path}")
 
+def process_file(input_path, output_path=None, lang=DEFAULT_LANG, tess_path='tesseract', image=None):
+    """
+    PNG 한 장을 PDF로 변환합니다. (GUI 등에서 모듈로 직접 호출)
+    Convert a single PNG to a searchable PDF.
+    image(PIL Image)가 주어지면 파일을 다시 읽지 않고 그 이미지를 stdin으로 넘깁니다.
+    """
+    input_path = Path(input_path)
+    output_path = Path(output_path) if output_path else input_path.with_suffix('.pdf')
+    if image is not None:
+        run_tesseract_image(image, output_path, lang, tess_path)
+    else:
+        run_tesseract(input_path, output_path, lang, tess_path)
+    logger.info(f"PDF 저장: {output_path}")
+    return output_path
+
+def process_directory(input_dir, output_dir=None, lang=DEFAULT_LANG, tess_path='tesseract', merge=False, jobs=None):
+    """
+    디렉토리의 모든 PNG를 PDF로 변환하고, 필요하면 병합합니다.
+    Convert every PNG in a directory to PDF and optionally merge them.
+    Tesseract는 페이지당 단일 스레드이므로 최대 jobs개(기본: CPU 수)를 동시에 실행합니다.
+    pikepdf가 있으면 페이지를 묶어 tesseract 한 번에 처리합니다 (프로세스 기동/모델 로드 비용 절감).
+    """
+    input_dir = Path(input_dir)
+    output_dir = Path(output_dir) if output_dir else input_dir
+    output_dir.mkdir(exist_ok=True)
+    png_files = _list_ext(input_dir, {'.png'})
+    tasks = []
+    for png in png_files:
+        pdf_path = output_dir / (png.stem + '.pdf')
+        if pdf_path.exists():
+            logger.info(f"이미 존재: {pdf_path} → 건너뜀")
+        else:
+            tasks.append((png, pdf_path))
+    jobs = jobs or os.cpu_count() or 1
+    # 실제 작업은 tesseract 자식 프로세스가 하므로 스레드로 띄워 기다리기만 함
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        # 모든 작업자가 일하도록 묶음 크기를 페이지 수/jobs 이하로 제한
+        size = min(BATCH_PAGES, -(-len(tasks) // jobs))
+        if pikepdf is not None and size > 1:
+            futures = [executor.submit(run_tesseract_batch, tasks[i:i + size], lang, tess_path)
+                       for i in range(0, len(tasks), size)]
+        else:
+            futures = [executor.submit(process_file, png, pdf_path, lang, tess_path) for png, pdf_path in tasks]
+        for future in futures:
+            future.result()
+    if merge:
+        merged_path = output_dir / f"{input_dir.name}_merged.pdf"
+        # 이전 실행에서 만든 병합 파일은 다시 병합하지 않음 (같은 경로에 덮어씀)
+        all_pdfs = [p for p in _list_ext(output_dir, {'.pdf'}) if p.name != merged_path.name]
+        if not all_pdfs:
+            logger.warning(f"병합할 PDF 파일이 없습니다: {output_dir}")
+        else:
+            merge_pdfs(all_pdfs, merged_path)
+
 def main():
     parser = argparse.ArgumentParser(description='PNG → Tesseract Searchable PDF 변환 및 병합\nConvert PNG to searchable PDF and merge.',
         formatter_class=argparse.RawDescriptionHelpFormatter)
@@ -53,8 +219,9 @@ def main():
     parser.add_argument('--output-file', '-of', help='출력 파일 (Output file)')
     parser.add_argument('--output-dir', '-od', help='출력 디렉토리 (Output directory)')
     parser.add_argument('--merge', '-m', action='store_true', help='결과 병합 (Merge outputs)')
-    parser.add_argument('--lang', '-l', default='kor+eng+chi_tra', help='Tesseract 언어 (Language for OCR)')
+    parser.add_argument('--lang', '-l', default=DEFAULT_LANG, help='Tesseract 언어 (Language for OCR)')
     parser.add_argument('--tess', default='tesseract', help='Tesseract 실행 경로 (Tesseract path)')
+    parser.add_argument('--jobs', '-j', type=int, default=None, help='동시에 실행할 Tesseract 수 (Parallel Tesseract jobs, default: CPU count)')
     parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'], help='로그 레벨 (Log level)')
     args = parser.parse_args()
     # Logger 레벨 설정
@@ -63,31 +230,15 @@ def main():
     ch.setLevel(log_level)
 
     if args.input_file:
-        input_path = Path(args.input_file)
-        output_path = Path(args.output_file) if args.output_file else input_path.with_suffix('.pdf')
-        run_tesseract(input_path, output_path, args.lang, args.tess)
-        logger.info(f"PDF 저장: {output_path}")
+        process_file(args.input_file, args.output_file, args.lang, args.tess)
         return
 
     if args.input_dir:
-        input_dir = Path(args.input_dir)
-        output_dir = Path(args.output_dir) if args.output_dir else input_dir
-        output_dir.mkdir(exist_ok=True)
-        png_files = sorted(list(input_dir.glob('*.png')) + list(input_dir.glob('*.PNG')))
-        for png in png_files:
-            pdf_path = output_dir / (png.stem + '.pdf')
-            if pdf_path.exists():
-                logger.info(f"이미 존재: {pdf_path} → 건너뜀")
-            else:
-                run_tesseract(png, pdf_path, args.lang, args.tess)
-                logger.info(f"PDF 저장: {pdf_path}")
-        if args.merge:
-            all_pdfs = sorted(list(output_dir.glob('*.pdf')) + list(output_dir.glob('*.PDF')), key=lambda x: str(x))
-            if not all_pdfs:
-                logger.warning(f"병합할 PDF 파일이 없습니다: {output_dir}")
-            else:
-                merged_path = output_dir / f"{input_dir.name}_merged.pdf"
-                merge_pdfs(all_pdfs, merged_path)
+        try:
+            process_directory(args.input_dir, args.output_dir, args.lang, args.tess, merge=args.merge, jobs=args.jobs)
+        except RuntimeError as e:
+            logger.error(str(e))
+            sys.exit(1)
         return
     logger.error("--input-file/-if 또는 --input-dir/-id 중 하나를 지정하세요.")
     sys.exit(1)
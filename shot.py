@@ -5,9 +5,10 @@ import time
 import sys
 import subprocess
 import platform
-import psutil
-import cv2
-import numpy as np
+import re
+import queue
+import threading
+from pathlib import Path
 
 # Attempt to import pyautogui for screen/window capture. If unavailable, set to None for graceful error handling later.
 try:
@@ -16,7 +17,15 @@ try:
 except ImportError:
     pyautogui = None
 
-from PIL import Image
+from PIL import Image, ImageChops
+
+# pyobjc(Quartz/AppKit)가 있으면 윈도우 목록 조회와 앱 활성화를 osascript 없이 네이티브 API로 처리
+# (AppleScript 호출은 회당 수백 ms, Quartz 조회는 수 ms). 없으면 AppleScript로 대체
+try:
+    import Quartz
+    from AppKit import NSWorkspace, NSApplicationActivateIgnoringOtherApps
+except ImportError:
+    Quartz = None
 
 # Logger 설정 (한/영)
 # 로그 레벨 및 포맷을 통일적으로 관리합니다. (Consistent logger setup for all modules)
@@ -27,11 +36,209 @@ ch.setFormatter(formatter)
 if not logger.hasHandlers():
     logger.addHandler(ch)
 
+# PNG zlib 압축 레벨. 캡처 결과는 곧바로 OCR/PDF 입력으로 쓰이므로 용량보다 저장 속도를 우선
+# (Pillow 기본값 6은 4K 캡처에서 저장 시간의 대부분을 차지). --png-compress로 조정
+PNG_COMPRESS_LEVEL = 1
+# 배치 캡처에서 자르기/저장을 기다리는 최대 페이지 수
+CROP_QUEUE_SIZE = 4
+# 페이지 넘김 동작 후 다음 캡처까지 최소 대기 시간 (초)
+PAGE_SETTLE = 0.2
+# 이 픽셀 수 이상인 이미지만 numba 커널 사용 (작은 이미지는 Pillow가 더 빠름)
+NUMBA_MIN_PIXELS = 8_000_000
+
+# numba가 있으면 아주 큰 캡처(6K 화면 등)의 흰 테두리 탐색을 병렬 JIT 커널로 처리 (없으면 Pillow).
+# numba/numpy 임포트는 수 초가 걸리므로 그런 이미지를 처음 만났을 때만 불러옴 (CLI/GUI 시작 시간에 영향 없음)
+np = None
+prange = range
+_bbox_kernel = None  # None: 아직 불러오지 않음, False: numba 없음
+
+def _numba_bbox_kernel():
+    global np, prange, _bbox_kernel
+    if _bbox_kernel is None:
+        try:
+            import numpy as np
+            from numba import njit, prange
+        except ImportError:
+            _bbox_kernel = False
+        else:
+            _bbox_kernel = njit(parallel=True, cache=True)(_bbox_nonwhite)
+    return _bbox_kernel or None
+
+def _bbox_nonwhite(arr):
+    """
+    (x0, y0, x1, y1) of the non-white area of an HxWx3 uint8 array, or (-1, -1, -1, -1) if it is all white.
+    Rows are scanned in parallel; each row only looks for its first and last non-white column.
+    """
+    h, w = arr.shape[0], arr.shape[1]
+    left = np.full(h, w, np.int64)
+    right = np.full(h, -1, np.int64)
+    for yy in prange(h):
+        for xx in range(w):
+            if arr[yy, xx, 0] != 255 or arr[yy, xx, 1] != 255 or arr[yy, xx, 2] != 255:
+                left[yy] = xx
+                break
+        if left[yy] < w:
+            for xx in range(w - 1, left[yy] - 1, -1):
+                if arr[yy, xx, 0] != 255 or arr[yy, xx, 1] != 255 or arr[yy, xx, 2] != 255:
+                    right[yy] = xx
+                    break
+    y0, y1, x0, x1 = -1, -1, w, -1
+    for yy in range(h):
+        if right[yy] >= 0:
+            if y0 < 0:
+                y0 = yy
+            y1 = yy
+            x0 = min(x0, left[yy])
+            x1 = max(x1, right[yy])
+    if y0 < 0:
+        return -1, -1, -1, -1
+    return x0, y0, x1 + 1, y1 + 1
+
+class AppleScriptSession:
+    """
+    One long-lived `osascript -i` process fed scripts over stdin.
+    Batch capture runs several AppleScript snippets per page; reusing one process avoids an osascript launch
+    (fork/exec + LaunchServices registration) for every call.
+    A call that does not finish within its timeout kills the process and starts a fresh one.
+    """
+    _SENTINEL = '__applescript_session_end__'
+    _ERROR_MARK = '__applescript_session_error__'
+    _PROMPT_RE = re.compile(r'^(?:>>\s*)*(?:=>\s*)?')
+    DEFAULT_TIMEOUT = 15
+
+    def __init__(self):
+        self.proc = None
+        self._lines = None
+
+    def __enter__(self):
+        self._start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _start(self):
+        self.proc = subprocess.Popen(
+            ['osascript', '-i', '-s', 's'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1,
+        )
+        # 파이프 읽기에는 타임아웃이 없으므로 읽기 스레드가 줄을 큐에 넣고, run()은 큐에서 마감 시각까지만 기다림
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_lines, args=(self.proc.stdout, self._lines), daemon=True).start()
+
+    @staticmethod
+    def _read_lines(stdout, lines):
+        for line in stdout:
+            lines.put(line)
+        lines.put(None)
+
+    @staticmethod
+    def _quote(source):
+        return '"' + source.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+
+    def run(self, script, timeout=None):
+        """
+        Run one AppleScript snippet and return its printed result.
+        Interactive mode reads one statement per line, so the source is wrapped in `run script`.
+        Raises RuntimeError if the script fails or does not finish within timeout seconds.
+        """
+        if self.proc is None or self.proc.poll() is not None:
+            raise RuntimeError("osascript session is not running")
+        # 오류는 일반 결과처럼 출력되므로 try로 감싸 표시 문자열을 돌려받음 (문법 오류도 바깥 try에서 잡힘)
+        wrapped = (f"try\nrun script {self._quote(script.strip())}\n"
+                   f'on error errMsg number errNum\nreturn "{self._ERROR_MARK}" & errNum & ": " & errMsg\nend try')
+        # 결과 뒤에 sentinel 문자열을 출력시켜 이 스크립트의 출력이 끝난 지점을 표시
+        self.proc.stdin.write(f'run script {self._quote(wrapped)}\n"{self._SENTINEL}"\n')
+        self.proc.stdin.flush()
+        deadline = time.monotonic() + (timeout or self.DEFAULT_TIMEOUT)
+        lines = []
+        while True:
+            try:
+                line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                # 응답 없는 호출(System Events 멈춤 등)이 배치를 막지 않도록 프로세스를 버리고 새로 띄움
+                self.close(kill=True)
+                self._start()
+                raise RuntimeError(f"AppleScript timed out after {timeout or self.DEFAULT_TIMEOUT}s")
+            if line is None:
+                raise RuntimeError("osascript session exited unexpectedly")
+            if self._SENTINEL in line:
+                break
+            line = self._PROMPT_RE.sub('', line.rstrip('\n'))
+            if line:
+                lines.append(line)
+        output = '\n'.join(lines)
+        if self._ERROR_MARK in output or output.startswith('!!'):
+            message = output.split(self._ERROR_MARK, 1)[-1].strip().strip('"')
+            raise RuntimeError(f"AppleScript failed: {message}")
+        return output
+
+    def close(self, kill=False):
+        if self.proc is not None and self.proc.poll() is None:
+            if kill:
+                self.proc.kill()
+                self.proc.wait()
+                return
+            self.proc.stdin.close()
+            try:
+                self.proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+
+def run_applescript(script, osa=None, timeout=15):
+    """
+    Run AppleScript through the given session, or a one-off osascript process if none.
+    Returns stdout; raises RuntimeError on failure or timeout.
+    """
+    if osa is not None:
+        return osa.run(script, timeout)
+    try:
+        result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"AppleScript timed out after {timeout}s")
+    if result.returncode != 0:
+        raise RuntimeError(f"AppleScript failed: {result.stderr}")
+    return result.stdout
+
 class WindowCapture:
     """
     macOS only: Provides window and fullscreen capture using pyautogui and AppleScript.
     This class centralizes all capture-related logic for maintainability and platform-specific handling.
     """
+    # (app_name, window_title) → (조회 시각, 결과). 배치 루프에서 같은 윈도우를 반복 조회할 때 재사용
+    WINDOW_INFO_TTL = 2.0
+    _window_info_cache = {}
+    # 실행 중인 앱의 윈도우 목록을 "proc|win|x|y|w|h" 항목으로 반환하는 AppleScript (pyobjc가 없을 때 사용)
+    _ENUM_SCRIPT = '''
+    tell application "System Events"
+        set windowList to {}
+        repeat with proc in (every process whose background only is false)
+            try
+                set procName to name of proc
+                repeat with win in (every window of proc)
+                    try
+                        set winName to name of win
+                        set winPos to position of win
+                        set winSize to size of win
+                        set x to item 1 of winPos
+                        set y to item 2 of winPos
+                        set w to item 1 of winSize
+                        set h to item 2 of winSize
+                        if w > 10 and h > 10 then
+                            if winName is "" then set winName to "<" & procName & ">"
+                            set end of windowList to procName & "|" & winName & "|" & x & "|" & y & "|" & w & "|" & h
+                        end if
+                    end try
+                end repeat
+            end try
+        end repeat
+        return windowList
+    end tell
+    '''
+    _compiled_enum_path = None
+    # AppleScript 목록 출력의 "proc|win|x|y|w|h" 항목. 일반 출력(a, b)과 세션의 -s s 출력({"a", "b"}) 모두 처리
+    _WIN_RE = re.compile(r'[{\s,"]*([^|,{"]+)\|([^|"]*)\|(-?[\d.]+)\|(-?[\d.]+)\|(-?[\d.]+)\|(-?[\d.]+)')
+
     @staticmethod
     def _check_dependencies():
         # Check for required dependencies and platform. This ensures the tool fails fast with clear errors if misconfigured.
@@ -46,158 +253,197 @@ class WindowCapture:
             missing.append("macOS only")
         if missing:
             logger.error(f"Missing or unsupported: {', '.join(missing)}")
-            logger.error("Install with: pip install pyautogui pillow psutil")
+            logger.error("Install with: pip install pyautogui pillow")
             return False
         return True
 
     @staticmethod
-    def list_windows():
+    def _enumerate_windows_quartz():
+        """
+        Enumerate on-screen windows with Quartz (CGWindowListCopyWindowInfo).
+        Minimized windows and windows on other Spaces are not listed, and proc_name is the localized app name.
+        Returns a list of (proc_name, win_name, x, y, w, h).
+        """
+        options = Quartz.kCGWindowListOptionOnScreenOnly | Quartz.kCGWindowListExcludeDesktopElements
+        windows = []
+        for info in Quartz.CGWindowListCopyWindowInfo(options, Quartz.kCGNullWindowID) or []:
+            # 일반 앱 윈도우(레이어 0)만 사용 (메뉴 막대, Dock 등 제외)
+            if info.get(Quartz.kCGWindowLayer, 0) != 0:
+                continue
+            bounds = info.get(Quartz.kCGWindowBounds) or {}
+            x, y = int(bounds.get('X', 0)), int(bounds.get('Y', 0))
+            w, h = int(bounds.get('Width', 0)), int(bounds.get('Height', 0))
+            if w <= 10 or h <= 10:
+                continue
+            proc_name = info.get(Quartz.kCGWindowOwnerName) or ''
+            # 화면 기록 권한이 없으면 윈도우 이름이 비어 있음 → AppleScript와 같은 형식으로 대체
+            win_name = info.get(Quartz.kCGWindowName) or f"<{proc_name}>"
+            windows.append((proc_name, win_name, x, y, w, h))
+        return windows
+
+    @staticmethod
+    def _compiled_enum_script():
+        """
+        Compile _ENUM_SCRIPT once into ~/.cache/capture_mac/enum.scpt (recompiled when the source changes).
+        Returns the .scpt path, or None if osacompile is unavailable or failed.
+        """
+        if WindowCapture._compiled_enum_path is not None:
+            return WindowCapture._compiled_enum_path or None
+        cache_dir = Path.home() / '.cache' / 'capture_mac'
+        source = cache_dir / 'enum.applescript'
+        compiled = cache_dir / 'enum.scpt'
+        try:
+            if not (compiled.exists() and source.exists() and source.read_text(encoding='utf-8') == WindowCapture._ENUM_SCRIPT):
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                source.write_text(WindowCapture._ENUM_SCRIPT, encoding='utf-8')
+                subprocess.run(['osacompile', '-o', str(compiled), str(source)], check=True, capture_output=True, timeout=15)
+            WindowCapture._compiled_enum_path = str(compiled)
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.debug(f"osacompile failed, running AppleScript source instead: {e}")
+            WindowCapture._compiled_enum_path = ''
+        return WindowCapture._compiled_enum_path or None
+
+    @staticmethod
+    def _enumerate_windows_applescript(osa=None):
+        """
+        Enumerate windows via System Events (fallback when pyobjc is not installed).
+        Returns a list of (proc_name, win_name, x, y, w, h), or None if AppleScript failed.
+        """
+        compiled = WindowCapture._compiled_enum_script()
+        # 컴파일된 .scpt를 실행하면 매번 AppleScript 소스를 파싱하지 않음
+        script = f'run script (POSIX file "{compiled}")' if compiled else WindowCapture._ENUM_SCRIPT
+        try:
+            windows_data = run_applescript(script, osa).strip()
+        except RuntimeError as e:
+            logger.error(str(e))
+            return None
+        return [(proc_name, win_name, int(float(x)), int(float(y)), int(float(w)), int(float(h)))
+                for proc_name, win_name, x, y, w, h in WindowCapture._WIN_RE.findall(windows_data)]
+
+    @staticmethod
+    def _enumerate_windows(osa=None):
+        if Quartz is not None:
+            return WindowCapture._enumerate_windows_quartz()
+        return WindowCapture._enumerate_windows_applescript(osa)
+
+    @staticmethod
+    def list_windows(osa=None):
         """
         Print all available windows (app name, title, position, size).
-        Uses AppleScript to enumerate windows, as Python cannot natively access this info on macOS.
+        Uses Quartz when pyobjc is installed, otherwise AppleScript.
         """
-        script = '''
-        tell application "System Events"
-            set windowList to {}
-            repeat with proc in (every process whose background only is false)
-                try
-                    set procName to name of proc
-                    repeat with win in (every window of proc)
-                        try
-                            set winName to name of win
-                            set winPos to position of win
-                            set winSize to size of win
-                            set x to item 1 of winPos
-                            set y to item 2 of winPos
-                            set w to item 1 of winSize
-                            set h to item 2 of winSize
-                            if w > 10 and h > 10 then
-                                if winName is "" then set winName to "<" & procName & ">"
-                                set end of windowList to procName & "|" & winName & "|" & x & "|" & y & "|" & w & "|" & h
-                            end if
-                        end try
-                    end repeat
-                end try
-            end repeat
-            return windowList
-        end tell
-        '''
-        result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True, timeout=15)
-        if result.returncode != 0:
-            logger.error(f"AppleScript failed: {result.stderr}")
+        windows = WindowCapture._enumerate_windows(osa)
+        if windows is None:
             return
-        windows_data = result.stdout.strip()
-        if not windows_data or windows_data == "{}":
+        if not windows:
             logger.error("No windows found")
             return
-        content = windows_data[1:-1] if windows_data.startswith('{') and windows_data.endswith('}') else windows_data
-        items = [i.strip().strip('"') for i in content.split(',') if i.strip()]
         logger.info("\nAvailable Windows:")
-        for i, item in enumerate(items, 1):
-            parts = item.split('|')
-            if len(parts) == 6:
-                proc_name, win_name, x, y, w, h = parts
-                logger.info(f"{i:2d}. [{proc_name}] {win_name}  ({x},{y}) {w}x{h}")
+        for i, (proc_name, win_name, x, y, w, h) in enumerate(windows, 1):
+            logger.info(f"{i:2d}. [{proc_name}] {win_name}  ({x},{y}) {w}x{h}")
 
     @staticmethod
-    def get_window_info(app_name=None, window_title=None):
+    def invalidate_window_cache():
+        # 윈도우를 옮기거나 크기를 바꾼 뒤에는 캐시된 좌표가 틀리므로 비움
+        WindowCapture._window_info_cache.clear()
+
+    @staticmethod
+    def get_window_info(app_name=None, window_title=None, osa=None):
         """
         Return window info only if app_name or title is an exact match (case-insensitive).
-        Uses AppleScript for window enumeration, as this is not possible natively in Python on macOS.
+        Uses Quartz when pyobjc is installed, otherwise AppleScript.
+        Results are cached for WINDOW_INFO_TTL seconds.
         """
         if not WindowCapture._check_dependencies():
             return None
-        script = '''
-        tell application "System Events"
-            set windowList to {}
-            repeat with proc in (every process whose background only is false)
-                try
-                    set procName to name of proc
-                    repeat with win in (every window of proc)
-                        try
-                            set winName to name of win
-                            set winPos to position of win
-                            set winSize to size of win
-                            set x to item 1 of winPos
-                            set y to item 2 of winPos
-                            set w to item 1 of winSize
-                            set h to item 2 of winSize
-                            if w > 10 and h > 10 then
-                                if winName is "" then set winName to "<" & procName & ">"
-                                set end of windowList to procName & "|" & winName & "|" & x & "|" & y & "|" & w & "|" & h
-                            end if
-                        end try
-                    end repeat
-                end try
-            end repeat
-            return windowList
-        end tell
-        '''
-        result = subprocess.run(['osascript', '-e', script], capture_output=True, text=True, timeout=15)
-        if result.returncode != 0:
-            logger.error(f"AppleScript failed: {result.stderr}")
-            return None
-        windows_data = result.stdout.strip()
-        if not windows_data or windows_data == "{}":
-            logger.error("No windows found")
+        key = (app_name, window_title)
+        cached = WindowCapture._window_info_cache.get(key)
+        if cached and time.monotonic() - cached[0] < WindowCapture.WINDOW_INFO_TTL:
+            return cached[1]
+        info = WindowCapture._find_window(app_name, window_title, osa)
+        if info:
+            WindowCapture._window_info_cache[key] = (time.monotonic(), info)
+        return info
+
+    @staticmethod
+    def _find_window(app_name, window_title, osa=None):
+        windows = WindowCapture._enumerate_windows(osa)
+        match = WindowCapture._match_window(windows or [], app_name, window_title)
+        if match is None and Quartz is not None:
+            # Quartz는 현재 화면에 보이는 윈도우만 나열하고 앱 이름도 현지화된 이름이므로,
+            # 찾지 못하면 System Events 목록(최소화/다른 Space 윈도우, 프로세스 이름)으로 다시 찾음
+            windows = WindowCapture._enumerate_windows_applescript(osa)
+            match = WindowCapture._match_window(windows or [], app_name, window_title)
+        if windows is None:
             return None
-        windows = []
-        content = windows_data[1:-1] if windows_data.startswith('{') and windows_data.endswith('}') else windows_data
-        items = [i.strip().strip('"') for i in content.split(',') if i.strip()]
-        for item in items:
-            parts = item.split('|')
-            if len(parts) == 6:
-                try:
-                    proc_name, win_name, x, y, w, h = parts
-                    x, y, w, h = int(float(x)), int(float(y)), int(float(w)), int(float(h))
-                    windows.append((proc_name, win_name, x, y, w, h))
-                except Exception:
-                    continue
+        if match is None:
+            logger.error("No exact matching window found" if windows else "No windows found")
+        return match
+
+    @staticmethod
+    def _match_window(windows, app_name, window_title):
         # Only exact match (case-insensitive) to avoid ambiguity and ensure user intent.
         for proc_name, win_name, x, y, w, h in windows:
             if app_name and proc_name.lower() == app_name.lower():
                 return (proc_name, win_name, x, y, w, h)
             if window_title and win_name.lower() == window_title.lower():
                 return (proc_name, win_name, x, y, w, h)
-        logger.error("No exact matching window found")
         return None
 
     @staticmethod
-    def crop_left_third(image_path, output_path, margin_top=0, margin_bottom=0, margin_left=0, margin_right=0):
+    def crop_left_third(image, output_path, margin_top=0, margin_bottom=0, margin_left=0, margin_right=0,
+                        compress_level=PNG_COMPRESS_LEVEL):
         """
-        Open image, then crop outer non-white using Pillow+numpy and save final output.
+        Crop outer non-white using Pillow and save final output.
+        image may be a PIL Image (kept in memory, no temp file) or a path. Returns the cropped Image, or None on failure.
         Only the left third is kept, and margins are applied after non-white crop for clean results.
         """
         try:
-            img = Image.open(image_path)
-            temp_path = output_path + ".cvtmp.png"
-            img.save(temp_path)
-            # Crop outer non-white using Pillow+numpy for robust whitespace removal.
-            WindowCapture.crop_nonwhite_bbox_with_margin(temp_path, output_path, margin_top, margin_bottom, margin_left, margin_right)
-            os.remove(temp_path)
+            # Crop outer non-white using Pillow for robust whitespace removal.
+            cropped = WindowCapture.crop_nonwhite_bbox_with_margin(image, output_path, margin_top, margin_bottom, margin_left, margin_right,
+                                                                   compress_level)
             logger.info(f"Cropped image saved: {output_path}")
-            return True
+            return cropped
         except Exception as e:
             logger.error(f"Cropping failed: {e}")
-            return False
+            return None
+
+    @staticmethod
+    def _has_nonwhite(img):
+        return ImageChops.difference(img, Image.new("RGB", img.size, (255, 255, 255))).getbbox() is not None
 
     @staticmethod
-    def crop_nonwhite_bbox_with_margin(input_path, output_path, margin_top=0, margin_bottom=0, margin_left=0, margin_right=0):
+    def crop_nonwhite_bbox_with_margin(image, output_path=None, margin_top=0, margin_bottom=0, margin_left=0, margin_right=0,
+                                       compress_level=PNG_COMPRESS_LEVEL):
         """
-        Use Pillow+numpy to crop out all outer areas that are not pure white (255,255,255), then apply margins.
+        Use Pillow to crop out all outer areas that are not pure white (255,255,255), then apply margins.
         This ensures the final image is tightly cropped to content, which is important for OCR and PDF generation.
+        image may be a PIL Image or a path. Returns the cropped Image, and saves it if output_path is given.
         """
-        img = Image.open(input_path).convert("RGB")
-        arr = np.array(img)
-        mask = np.all(arr == 255, axis=2)  # True: pure white
-        coords = np.argwhere(~mask)
-        if coords.size == 0:
+        img = image if isinstance(image, Image.Image) else Image.open(image)
+        if img.mode != "RGB":
+            img = img.convert("RGB")
+        width, height = img.size
+        # 네 가장자리 줄마다 흰색이 아닌 픽셀이 있으면 경계 상자는 이미지 전체이므로 전체 스캔을 생략
+        # (이미 왼쪽 1/3로 잘라 테두리가 없는 캡처에서 흔한 경우)
+        edges = [(0, 0, width, 1), (0, height - 1, width, height), (0, 0, 1, height), (width - 1, 0, width, height)]
+        if all(WindowCapture._has_nonwhite(img.crop(edge)) for edge in edges):
+            bbox = (0, 0, width, height)
+        elif width * height >= NUMBA_MIN_PIXELS and _numba_bbox_kernel() is not None:
+            bbox = _numba_bbox_kernel()(np.asarray(img))
+            if bbox[0] < 0:
+                bbox = None
+        else:
+            # 흰 배경과의 차이 이미지에서 0이 아닌 영역 = 흰색이 아닌 영역. Pillow의 C 루프로 경계만 구함
+            white = Image.new("RGB", img.size, (255, 255, 255))
+            bbox = ImageChops.difference(img, white).getbbox()
+        if bbox is None:
             logger.warning("Non-white area not found. Saving original.")
-            img.save(output_path)
+            if output_path:
+                img.save(output_path, compress_level=compress_level, optimize=False)
             logger.info(f"Final cropped image size: {img.size}")
-            return True
-        y0, x0 = coords.min(axis=0)
-        y1, x1 = coords.max(axis=0) + 1
+            return img
+        x0, y0, x1, y1 = bbox
         # Apply margins, ensuring we don't crop past image bounds.
         y0 = max(0, y0 + margin_top)
         y1 = max(y0, y1 - margin_bottom)
@@ -205,11 +451,44 @@ class WindowCapture:
         x1 = max(x0, x1 - margin_right)
         cropped = img.crop((x0, y0, x1, y1))
         logger.info(f"Final cropped image size (after margin): {cropped.size}")
-        cropped.save(output_path)
-        return True
+        if output_path:
+            cropped.save(output_path, compress_level=compress_level, optimize=False)
+        return cropped
 
     @staticmethod
-    def capture_window(x, y, width, height, output_path, margin_top=0, margin_bottom=0, margin_left=0, margin_right=0):
+    def _quartz_grab(x, y, width, height):
+        """
+        Grab a screen rectangle with CoreGraphics and wrap the pixel buffer as a PIL Image.
+        Unlike pyautogui (screencapture → temp PNG → reopen), this stays in process with no encode/decode.
+        """
+        rect = Quartz.CGRectMake(x, y, width, height)
+        cg_image = Quartz.CGWindowListCreateImage(
+            rect, Quartz.kCGWindowListOptionOnScreenOnly, Quartz.kCGNullWindowID, Quartz.kCGWindowImageDefault)
+        if cg_image is None:
+            raise RuntimeError("CGWindowListCreateImage failed (check Screen Recording permission)")
+        # Retina 화면에서는 픽셀 크기가 요청한 포인트 크기와 다를 수 있으므로 CGImage의 실제 크기/행 간격 사용
+        w = Quartz.CGImageGetWidth(cg_image)
+        h = Quartz.CGImageGetHeight(cg_image)
+        bytes_per_row = Quartz.CGImageGetBytesPerRow(cg_image)
+        data = Quartz.CGDataProviderCopyData(Quartz.CGImageGetDataProvider(cg_image))
+        return Image.frombuffer("RGBA", (w, h), bytes(data), "raw", "BGRA", bytes_per_row, 1).convert("RGB")
+
+    @staticmethod
+    def grab_window(x, y, width, height):
+        """
+        Grab the left third of a window as a PIL Image (no cropping, nothing written to disk).
+        Uses Quartz when pyobjc is installed, otherwise pyautogui.
+        """
+        # Only capture the left 1/3 of the window for consistent output and to match user requirements.
+        region_width = width // 3
+        logger.info(f"Capturing region ({x}, {y}) {region_width}x{height} (left 1/3 of window)...")
+        if Quartz is not None:
+            return WindowCapture._quartz_grab(x, y, region_width, height)
+        return pyautogui.screenshot(region=(x, y, region_width, height))
+
+    @staticmethod
+    def capture_window(x, y, width, height, output_path, margin_top=0, margin_bottom=0, margin_left=0, margin_right=0,
+                       compress_level=PNG_COMPRESS_LEVEL):
         """
         Capture the left third of a window using pyautogui, then crop and save.
         This approach is chosen to focus on a specific region (e.g., for book scanning or document capture).
@@ -218,153 +497,275 @@ class WindowCapture:
             if not pyautogui:
                 logger.error("pyautogui is required for capturing")
                 return False
-            # Only capture the left 1/3 of the window for consistent output and to match user requirements.
-            region_width = width // 3
-            logger.info(f"Capturing region ({x}, {y}) {region_width}x{height} (left 1/3 of window)...")
-            temp_path = output_path + ".tmp.png"
-            screenshot = pyautogui.screenshot(region=(x, y, region_width, height))
-            screenshot.save(temp_path)
-            WindowCapture.crop_left_third(temp_path, output_path, margin_top, margin_bottom, margin_left, margin_right)
-            os.remove(temp_path)
+            screenshot = WindowCapture.grab_window(x, y, width, height)
+            # 스크린샷(PIL Image)을 임시 PNG로 저장/재로딩하지 않고 바로 자르기 단계로 넘김
+            WindowCapture.crop_left_third(screenshot, output_path, margin_top, margin_bottom, margin_left, margin_right,
+                                          compress_level)
             return True
         except Exception as e:
             logger.error(f"Capture failed: {str(e)}")
             return False
 
     @staticmethod
-    def capture_fullscreen(output_path, margin_top=0, margin_bottom=0, margin_left=0, margin_right=0):
+    def capture_fullscreen(output_path, margin_top=0, margin_bottom=0, margin_left=0, margin_right=0,
+                           compress_level=PNG_COMPRESS_LEVEL):
         """
-        Capture the entire screen, then crop and save only the left third.
+        Capture the left third of the screen, then crop and save.
         This is a fallback for when no window is specified, ensuring the tool is always usable.
+        Only the left third is requested from the capture API, so the rest of the screen is never copied.
         """
         try:
             if not pyautogui:
                 logger.error("pyautogui is required for capturing")
                 return False
-            logger.info("Capturing full screen...")
-            temp_path = output_path + ".tmp.png"
-            screenshot = pyautogui.screenshot()
-            screenshot.save(temp_path)
-            WindowCapture.crop_left_third(temp_path, output_path, margin_top, margin_bottom, margin_left, margin_right)
-            os.remove(temp_path)
+            screen_w, screen_h = pyautogui.size()
+            logger.info("Capturing full screen (left 1/3)...")
+            screenshot = WindowCapture.grab_window(0, 0, screen_w, screen_h)
+            # 스크린샷(PIL Image)을 임시 PNG로 저장/재로딩하지 않고 바로 자르기 단계로 넘김
+            WindowCapture.crop_left_third(screenshot, output_path, margin_top, margin_bottom, margin_left, margin_right,
+                                          compress_level)
             return True
         except Exception as e:
             logger.error(f"Capture failed: {str(e)}")
             return False
 
-def activate_app(app_name):
+def _find_running_app(app_name):
+    # 실행 중인 앱 중 이름(대소문자 무시)이 같은 NSRunningApplication
+    if Quartz is None:
+        return None
+    name = app_name.lower()
+    for app in NSWorkspace.sharedWorkspace().runningApplications():
+        if (app.localizedName() or '').lower() == name:
+            return app
+    return None
+
+def _is_frontmost(app_name):
+    # 이미 맨 앞에 있는 앱이면 활성화(및 대기)를 건너뜀. pyobjc가 없으면 알 수 없으므로 False
+    if Quartz is None:
+        return False
+    front = NSWorkspace.sharedWorkspace().frontmostApplication()
+    return front is not None and (front.localizedName() or '').lower() == app_name.lower()
+
+def _activate_app_native(app_name):
+    """
+    Activate the app through AppKit without spawning osascript. Returns False if not possible.
+    """
+    app = _find_running_app(app_name)
+    if app is None:
+        return False
+    return bool(app.activateWithOptions_(NSApplicationActivateIgnoringOtherApps))
+
+def activate_app(app_name, osa=None):
     """
     Activate the given app using AppleScript (bring to foreground).
     This is necessary for automation, as only the frontmost window can be reliably captured.
     """
     try:
-        script = f'tell application "{app_name}" to activate'
-        subprocess.run(['osascript', '-e', script], capture_output=True, timeout=5)
+        if _is_frontmost(app_name):
+            logger.debug(f"App already frontmost: {app_name}")
+            return
+        if not _activate_app_native(app_name):
+            run_applescript(f'tell application "{app_name}" to activate', osa, timeout=5)
         logger.info(f"Activated app: {app_name}")
         time.sleep(0.5)  # Wait for the app to come to the foreground.
     except Exception as e:
         logger.warning(f"Failed to activate app {app_name}: {e}")
 
-def set_window_size_and_position(app_name, width=None, height=None, x=None, y=None):
+# pyautogui 키 이름 → macOS 가상 키 코드 (페이지 넘김에 쓰이는 키)
+_KEYCODES = {
+    'left': 123, 'right': 124, 'down': 125, 'up': 126,
+    'space': 49, 'return': 36, 'enter': 76, 'tab': 48, 'esc': 53, 'escape': 53,
+    'pageup': 116, 'pagedown': 121, 'home': 115, 'end': 119,
+}
+
+def _post_key(keycode):
+    # 키 누름/뗌 이벤트를 HID 이벤트 탭에 직접 전달 (pyautogui의 파이썬 래퍼 단계를 거치지 않음)
+    for down in (True, False):
+        event = Quartz.CGEventCreateKeyboardEvent(None, keycode, down)
+        Quartz.CGEventPost(Quartz.kCGHIDEventTap, event)
+
+def _post_click(x, y):
+    for event_type in (Quartz.kCGEventLeftMouseDown, Quartz.kCGEventLeftMouseUp):
+        event = Quartz.CGEventCreateMouseEvent(None, event_type, (x, y), Quartz.kCGMouseButtonLeft)
+        Quartz.CGEventPost(Quartz.kCGHIDEventTap, event)
+
+def _next_page_action(next_action):
+    """
+    Parse --next once ('x,y' click or key name) and return a no-argument callable that turns the page.
+    Uses CGEventPost when Quartz is available, otherwise pyautogui.
+    """
+    if ',' in next_action:
+        try:
+            nx, ny = map(int, next_action.split(','))
+        except ValueError:
+            raise ValueError("--next must be 'x,y' for click or a key name for press.")
+        if Quartz is not None:
+            return lambda: _post_click(nx, ny)
+        return lambda: pyautogui.click(nx, ny)
+    keycode = _KEYCODES.get(next_action.lower())
+    if Quartz is not None and keycode is not None:
+        return lambda: _post_key(keycode)
+    return lambda: pyautogui.press(next_action)
+
+def set_window_size_and_position(app_name, width=None, height=None, x=None, y=None, osa=None):
     """
     Set the front window of the app to the given size and position using AppleScript.
     This allows for consistent capture regions, which is important for batch operations.
+    Returns the window rect (x, y, w, h) actually applied, read back in the same AppleScript call, or None on failure.
     """
     if width is None and height is None and x is None and y is None:
-        return
+        return None
     size_part = f"set size of front window of theApp to {{{width if width else 'item 1 of size of front window of theApp'}, {height if height else 'item 2 of size of front window of theApp'}}}"
     pos_part = f"set position of front window of theApp to {{{x}, {y}}}" if x is not None and y is not None else ""
+    # Quartz가 돌려준 이름은 현지화된 앱 이름이라 System Events 프로세스 이름과 다를 수 있으므로,
+    # 실행 중인 앱을 찾으면 pid로 프로세스를 지정
+    running = _find_running_app(app_name)
+    process_ref = (f"first process whose unix id is {running.processIdentifier()}" if running is not None
+                   else f'first process whose name is "{app_name}"')
     script = f'''
     tell application "System Events"
-        set theApp to first process whose name is "{app_name}"
+        set theApp to {process_ref}
         {size_part}
         {pos_part}
+        set winPos to position of front window of theApp
+        set winSize to size of front window of theApp
+        return (item 1 of winPos as text) & "," & (item 2 of winPos) & "," & (item 1 of winSize) & "," & (item 2 of winSize)
     end tell
     '''
     try:
-        subprocess.run(['osascript', '-e', script], check=True)
-        logger.info(f"Set window size to {width}x{height} and position to {x},{y} for app '{app_name}'")
+        output = run_applescript(script, osa)
+        WindowCapture.invalidate_window_cache()
+        rect = tuple(int(float(v)) for v in output.strip().strip('"').split(','))
+        logger.info(f"Set window size to {width}x{height} and position to {x},{y} for app '{app_name}' → {rect}")
+        return rect
     except Exception as e:
         logger.warning(f"Failed to set window size/position: {e}")
+        return None
 
 def batch_capture(
-    app_name, window_label, output_dir, book, start, no, next_action, delay, width, height, top, bottom, left, right, log_level='DEBUG'
+    app_name, window_label, output_dir, book, start, no, next_action, delay, width, height, top, bottom, left, right, log_level='DEBUG',
+    on_page=None, png_compress=PNG_COMPRESS_LEVEL
 ):
     """
     Batch capture pages from a window and save as images.
+    Screenshots are taken on the calling thread; cropping and saving run on a worker thread so they overlap
+    with the page-turn wait. on_page(path, image) is called (from the worker) after each page is saved,
+    with the cropped PIL Image, so callers can start downstream stages per page without re-reading the PNG.
     Returns list of captured image paths.
     """
     logger.setLevel(getattr(logging, log_level.upper()))
     ch.setLevel(getattr(logging, log_level.upper()))
     if not WindowCapture._check_dependencies():
         raise RuntimeError("Missing dependencies or not macOS")
-    info = WindowCapture.get_window_info(app_name, window_label)
-    if not info:
-        raise RuntimeError("No matching window found")
-    proc_name, win_name, x, y, w, h = info
-    if width:
-        w = width
-    if height:
-        h = height
-    if width or height:
-        set_window_size_and_position(proc_name, width, height)
-        info = WindowCapture.get_window_info(app_name, window_label)
+    # 배치 동안 AppleScript 호출은 osascript 프로세스 하나로 처리
+    with AppleScriptSession() as osa:
+        info = WindowCapture.get_window_info(app_name, window_label, osa)
         if not info:
-            raise RuntimeError("No matching window after resize")
+            raise RuntimeError("No matching window found")
         proc_name, win_name, x, y, w, h = info
-    import pyautogui
-    screen_size = pyautogui.size()
-    logger.info(f"Window position: ({x}, {y}), size: {w}x{h}, screen size: {screen_size}")
-    activate_app(proc_name)
-    os.makedirs(output_dir, exist_ok=True)
-    total_pages = start + no - 1
-    pad_width = len(str(total_pages))
-    img_paths = []
-    for i in range(start, start + no):
-        logger.info(f"[Batch] Capturing page {i}")
-        activate_app(proc_name)
-        if delay > 0:
-            logger.debug(f"Waiting {delay} seconds before capture...")
-            time.sleep(delay)
-        out_path = os.path.join(output_dir, f"{book}_{str(i).zfill(pad_width)}.png")
-        WindowCapture.capture_window(x, y, w, h, out_path, top, bottom, left, right)
-        img_paths.append(out_path)
-        time.sleep(0.1)
-        if ',' in next_action:
-            try:
-                nx, ny = map(int, next_action.split(','))
-                pyautogui.click(nx, ny)
-            except Exception:
-                logger.error("--next must be 'x,y' for click or a key name for press.")
-                raise
-        else:
-            pyautogui.press(next_action)
-        time.sleep(0.1)
+        if width:
+            w = width
+        if height:
+            h = height
+        if width or height:
+            # 적용된 좌표/크기를 같은 AppleScript 호출에서 돌려받으므로 윈도우를 다시 조회하지 않음
+            rect = set_window_size_and_position(proc_name, width, height, osa=osa)
+            if rect:
+                x, y, w, h = rect
+            else:
+                info = WindowCapture.get_window_info(app_name, window_label, osa)
+                if not info:
+                    raise RuntimeError("No matching window after resize")
+                proc_name, win_name, x, y, w, h = info
+        import pyautogui
+        screen_size = pyautogui.size()
+        logger.info(f"Window position: ({x}, {y}), size: {w}x{h}, screen size: {screen_size}")
+        activate_app(proc_name, osa)
+        os.makedirs(output_dir, exist_ok=True)
+        total_pages = start + no - 1
+        pad_width = len(str(total_pages))
+        # 경로 앞부분은 배치마다 한 번만 만들고 루프에서는 페이지 번호만 붙임 (예: output/book_ + 007.png)
+        # (str.format 템플릿은 책 이름/경로에 중괄호가 있으면 깨지므로 접두어를 그대로 이어 붙임)
+        path_prefix = os.path.join(output_dir, f"{book}_")
+        img_paths = []
+        turn_page = _next_page_action(next_action)
+        # 캡처(화면 입력)는 이 스레드에서, 자르기/저장/on_page는 작업 스레드에서 처리하여 페이지 넘김 대기와 겹침.
+        # 큐 크기를 제한해 작업 스레드가 밀리면 캡처가 기다리도록 함 (4K 이미지가 메모리에 쌓이지 않게)
+        pages = queue.Queue(maxsize=CROP_QUEUE_SIZE)
+        errors = []
+
+        def crop_worker():
+            while True:
+                item = pages.get()
+                if item is None:
+                    return
+                if errors:
+                    continue  # 실패 후에는 캡처 스레드가 막히지 않도록 큐만 비움
+                screenshot, out_path = item
+                try:
+                    cropped = WindowCapture.crop_left_third(screenshot, out_path, top, bottom, left, right, png_compress)
+                    if cropped is None:
+                        raise RuntimeError(f"Failed to save page: {out_path}")
+                    if on_page:
+                        on_page(out_path, cropped)
+                except Exception as e:
+                    errors.append(e)
+
+        worker = threading.Thread(target=crop_worker, name='batch-crop', daemon=True)
+        worker.start()
+        # 페이지 넘김 후 다음 캡처까지의 최소 간격은 고정 sleep 대신 마감 시각으로 관리하여
+        # 그 사이의 작업(앱 활성화 등) 시간도 대기 시간에 포함되게 함
+        next_allowed = time.monotonic()
+        try:
+            for i in range(start, start + no):
+                if errors:
+                    break
+                logger.info(f"[Batch] Capturing page {i}")
+                activate_app(proc_name, osa)
+                if delay > 0:
+                    logger.debug(f"Waiting {delay} seconds before capture...")
+                remaining = next_allowed + delay - time.monotonic()
+                if remaining > 0:
+                    time.sleep(remaining)
+                out_path = f"{path_prefix}{i:0{pad_width}d}.png"
+                pages.put((WindowCapture.grab_window(x, y, w, h), out_path))
+                img_paths.append(out_path)
+                turn_page()
+                next_allowed = time.monotonic() + PAGE_SETTLE
+        finally:
+            pages.put(None)
+            worker.join()
+        if errors:
+            raise errors[0]
     logger.info(f"Batch capture complete. Images saved to {output_dir}")
     return img_paths
 
-def generate_pdfs(img_files, tess_path, lang):
+def generate_pdfs(img_files, tess_path, lang, jobs=None, images=None):
     """
     Generate searchable PDFs for each image using Tesseract.
-    Returns list of generated PDF paths.
+    Tesseract is single-threaded per page, so up to jobs (default: half the CPUs) run at once.
+    images: optional PIL Images matching img_files, piped to Tesseract via stdin instead of re-reading the PNGs.
+    Returns list of generated PDF paths (in input order).
     """
-    pdf_files = []
-    for img_path in img_files:
-        pdf_path = os.path.splitext(img_path)[0] + ".pdf"
-        cmd = [tess_path, img_path, os.path.splitext(img_path)[0], "-l", lang, "pdf"]
-        logger.debug(f"Running: {' '.join(cmd)}")
-        subprocess.run(cmd, check=True)
-        logger.info(f"PDF saved: {pdf_path}")
-        pdf_files.append(pdf_path)
+    import pdf
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    pdf_files = [os.path.splitext(img_path)[0] + ".pdf" for img_path in img_files]
+    jobs = jobs or max(1, (os.cpu_count() or 2) // 2)
+    # 실제 작업은 tesseract 자식 프로세스(OMP_THREAD_LIMIT=1)가 하므로 스레드는 기다리기만 함
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(pdf.process_file, img_path, pdf_path, lang, tess_path, image): pdf_path
+                   for img_path, pdf_path, image in zip(img_files, pdf_files, images or [None] * len(img_files))}
+        for future in as_completed(futures):
+            future.result()
+            logger.info(f"PDF saved: {futures[future]}")
     return pdf_files
 
 def run_ocr_on_dir(ocr_dir, merge=False):
     """
-    Run Mistral OCR (ocr.py) on all images in the directory.
+    Run Mistral OCR (llm_ocr.py) on all images in the directory.
     """
-    import asyncio
-    import ocr
-    asyncio.run(ocr.process_directory(ocr_dir, None, merge=merge))
+    import llm_ocr
+    llm_ocr.process_directory(ocr_dir, None, merge=merge)
     logger.info(f"Mistral OCR finished. Check {ocr_dir}")
 
 def merge_outputs(output_dir, file_prefix, pdf_files, do_pdf_merge, do_text_merge):
@@ -374,16 +775,12 @@ def merge_outputs(output_dir, file_prefix, pdf_files, do_pdf_merge, do_text_merg
     if do_pdf_merge and len(pdf_files) > 1:
         merged_pdf = os.path.join(output_dir, f"{file_prefix}_merged.pdf")
         logger.info(f"Merging PDFs into {merged_pdf}")
+        import pdf
         try:
-            from PyPDF2 import PdfMerger
-            merger = PdfMerger()
-            for pdf in pdf_files:
-                merger.append(pdf)
-            merger.write(merged_pdf)
-            merger.close()
+            pdf.merge_pdfs(pdf_files, merged_pdf)
             logger.info(f"Merged PDF saved: {merged_pdf}")
-        except ImportError:
-            logger.error("PyPDF2 is required for PDF merging. Install with: pip install PyPDF2")
+        except RuntimeError as e:
+            logger.error(str(e))
     if do_text_merge:
         merged_txt = os.path.join(output_dir, f"{os.path.basename(output_dir)}_merged.txt")
         if os.path.exists(merged_txt):
@@ -400,15 +797,17 @@ def main():
         epilog="""
 Capture Methods:
   1. Window Capture: Capture a window by exact app name or label (AppleScript)
-  2. Full Screen: If no window specified, capture entire screen
+  2. Full Screen: If no window specified, capture the left 1/3 of the screen
   3. Batch Page Capture: Use --start, --no, --dir/-D, --next to capture multiple pages in a loop (auto focus, capture, crop, save, and next page by click or keypress)
 
 After capture, only the left 1/3 of the image is saved, and then the outer pure-white area is automatically cropped. You can adjust the captured window size and apply crop margins.
 
 Use --show to print all available windows and exit.
+With pyobjc installed, windows are listed through Quartz, which only sees on-screen windows (not minimized
+windows or windows on other Spaces); if no on-screen window matches, the AppleScript window list is searched too.
 
 Dependencies:
-  pip install pyautogui pillow psutil numpy
+  pip install pyautogui pillow pyobjc-framework-Quartz
   (macOS only)
 
 Example:
@@ -427,6 +826,7 @@ Example:
     # shot.py 고유 옵션 (윈도우/캡처/마진/배치)
     parser.add_argument('--app', '-a', default='Windows App', help='앱 이름 (App name to capture, exact match, case-insensitive)')
     parser.add_argument('--label', '-L', default='Mini PC', help='윈도우 타이틀 (Window title/label to capture, exact match, case-insensitive)')
+    parser.add_argument('--book', '-B', help='파일명 접두어 (File name prefix for batch capture)')
     parser.add_argument('--show', '-s', action='store_true', help='윈도우 목록 출력 후 종료 (List all available windows and exit)')
     parser.add_argument('--start', '-S', default=1, type=int, help='시작 페이지 번호 (Start page number for batch capture)')
     parser.add_argument('--no', '-n', default=5, type=int, help='캡처할 페이지 수 (Number of pages to capture in batch)')
@@ -436,8 +836,10 @@ Example:
     parser.add_argument('--height', '-H', type=int, default=2160, help='윈도우 높이 (Override captured window height, pixels)')
     parser.add_argument('--top', '-t', type=int, default=60, help='상단 마진 (Crop margin from top, pixels)')
     parser.add_argument('--bottom', '-b', type=int, default=55, help='하단 마진 (Crop margin from bottom, pixels)')
-    parser.add_argument('--left', '-l', type=int, default=0, help='좌측 마진 (Crop margin from left, pixels)')
+    parser.add_argument('--left', type=int, default=0, help='좌측 마진 (Crop margin from left, pixels)')
     parser.add_argument('--right', '-r', type=int, default=0, help='우측 마진 (Crop margin from right, pixels)')
+    parser.add_argument('--png-compress', type=int, default=PNG_COMPRESS_LEVEL, choices=range(10), metavar='0-9',
+                        help=f'PNG 압축 레벨 (PNG zlib compression level, default: {PNG_COMPRESS_LEVEL})')
     args = parser.parse_args()
     # Logger 레벨 설정 (Set logger level)
     log_level = getattr(logging, args.log_level.upper())
@@ -452,78 +854,37 @@ Example:
         logger.debug(f"Waiting {args.delay} seconds...")
         time.sleep(args.delay)
     # Batch page capture mode: allows for automated multi-page capture, e.g., for digitizing books.
-    output_dir = args.dir
-    file_prefix = 'page'
-    if args.book:
-        output_dir = args.book
-        file_prefix = args.book
+    output_dir = args.output_dir
+    file_prefix = args.book or 'page'
     if args.start is not None and args.no is not None and output_dir and args.next:
         if not (args.app or args.label):
             logger.error("Batch mode requires --app or --label to specify the window.")
             sys.exit(1)
-        info = WindowCapture.get_window_info(args.app, args.label)
-        if not info:
+        try:
+            batch_capture(
+                args.app, args.label, output_dir, file_prefix, args.start, args.no, args.next, args.delay,
+                args.width, args.height, args.top, args.bottom, args.left, args.right, args.log_level,
+                png_compress=args.png_compress,
+            )
+        except (RuntimeError, ValueError) as e:
+            logger.error(str(e))
             sys.exit(1)
-        proc_name, win_name, x, y, w, h = info
-        # Always use --width/--height if given, else use AppleScript values for flexibility.
-        if args.width:
-            w = args.width
-        if args.height:
-            h = args.height
-        # Set window size if --width/--height are given for consistent capture area.
-        if args.width or args.height:
-            set_window_size_and_position(proc_name, args.width, args.height)
-            # Re-fetch window info after resizing to get updated coordinates.
-            info = WindowCapture.get_window_info(args.app, args.label)
-            if not info:
-                sys.exit(1)
-            proc_name, win_name, x, y, w, h = info
-        # Log window and screen info for debugging and reproducibility.
-        import pyautogui
-        screen_size = pyautogui.size()
-        logger.info(f"Window position: ({x}, {y}), size: {w}x{h}, screen size: {screen_size}")
-        activate_app(proc_name)
-        os.makedirs(output_dir, exist_ok=True)
-        # Determine zero padding width based on total page count
-        total_pages = args.start + args.no - 1
-        pad_width = len(str(total_pages))
-        for i in range(args.start, args.start + args.no):
-            logger.info(f"[Batch] Capturing page {i}")
-            activate_app(proc_name)
-            if args.delay > 0:
-                logger.debug(f"Waiting {args.delay} seconds before capture...")
-                time.sleep(args.delay)
-            out_path = os.path.join(output_dir, f"{file_prefix}_{str(i).zfill(pad_width)}.png")
-            # Always capture left 1/3: region=(x, y, w//3, h)
-            WindowCapture.capture_window(x, y, w, h, out_path, args.top, args.bottom, args.left, args.right)
-            time.sleep(0.1)
-            # Next page action: either click or keypress, for hands-free batch capture.
-            if ',' in args.next:
-                try:
-                    nx, ny = map(int, args.next.split(','))
-                    pyautogui.click(nx, ny)
-                except Exception:
-                    logger.error("--next must be 'x,y' for click or a key name for press.")
-                    sys.exit(1)
-            else:
-                pyautogui.press(args.next)
-            time.sleep(0.1)
-        logger.info(f"Batch capture complete. Images saved to {output_dir}")
         sys.exit(0)
     # Normal single capture mode: for ad-hoc or one-off captures.
     if args.app or args.label:
-        info = WindowCapture.get_window_info(args.app, args.label)
-        if not info:
-            sys.exit(1)
-        proc_name, win_name, x, y, w, h = info
+        with AppleScriptSession() as osa:
+            info = WindowCapture.get_window_info(args.app, args.label, osa)
+            if not info:
+                sys.exit(1)
+            proc_name, win_name, x, y, w, h = info
+            activate_app(proc_name, osa)
         if args.width:
             w = args.width
         if args.height:
             h = args.height
-        activate_app(proc_name)
-        WindowCapture.capture_window(x, y, w, h, args.output, args.top, args.bottom, args.left, args.right)
+        WindowCapture.capture_window(x, y, w, h, args.output, args.top, args.bottom, args.left, args.right, args.png_compress)
     else:
-        WindowCapture.capture_fullscreen(args.output, args.top, args.bottom, args.left, args.right)
+        WindowCapture.capture_fullscreen(args.output, args.top, args.bottom, args.left, args.right, args.png_compress)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
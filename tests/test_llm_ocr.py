@@ -0,0 +1,134 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import llm_ocr
+
+
+class FakeMistral:
+    """
+    Local stand-in for the Mistral API. ocr_statuses is consumed one status per /ocr call.
+    """
+    def __init__(self, ocr_statuses=(200,), url_status=200, files_status=200):
+        self.ocr_statuses = list(ocr_statuses)
+        self.url_status = url_status
+        self.files_status = files_status
+        self.calls = []
+
+    def handle(self, handler):
+        length = int(handler.headers.get('Content-Length') or 0)
+        body = handler.rfile.read(length) if length else b''
+        self.calls.append((handler.command, handler.path, dict(handler.headers), body))
+        path = handler.path.split('?')[0]
+        if handler.command == 'POST' and path == '/files':
+            if self.files_status != 200:
+                return self.files_status, {"error": "rejected"}
+            return 200, {"id": "file-1"}
+        if handler.command == 'GET' and path == '/files/file-1/url':
+            return self.url_status, {"url": "https://example.invalid/signed"}
+        if handler.command == 'DELETE' and path == '/files/file-1':
+            return 200, {"deleted": True}
+        if handler.command == 'POST' and path == '/ocr':
+            status = self.ocr_statuses.pop(0) if self.ocr_statuses else 200
+            if status == 200:
+                return 200, {"pages": [{"markdown": "hello"}]}
+            return status, {"error": "unavailable"}
+        return 404, {}
+
+    def ocr_calls(self):
+        return [call for call in self.calls if call[1] == '/ocr']
+
+
+@pytest.fixture
+def fake_api(monkeypatch, tmp_path):
+    api = FakeMistral()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self):
+            status, payload = api.handle(self)
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            if status >= 500 or status == 429:
+                self.send_header('Retry-After', '0')
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_DELETE = _reply
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(llm_ocr, 'MISTRAL_API_BASE', f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(llm_ocr, 'MISTRAL_API_KEY', 'test-key')
+    # requests 세션 경로를 검사하므로 httpx 클라이언트는 쓰지 않음
+    monkeypatch.setattr(llm_ocr, 'HTTP2_CLIENT', None)
+    monkeypatch.setattr(llm_ocr, 'CACHE_PATH', tmp_path / 'cache' / 'ocr.sqlite')
+    monkeypatch.setattr(llm_ocr, '_cache_conn', None)
+    yield api
+    server.shutdown()
+    server.server_close()
+    if llm_ocr._cache_conn:
+        llm_ocr._cache_conn.close()
+
+
+def _write_png(tmp_path, size):
+    path = tmp_path / 'page_1.png'
+    path.write_bytes(b'\x89PNG\r\n\x1a\n' + b'\0' * size)
+    return path
+
+
+def test_upload_path_without_httpx(fake_api, monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_ocr, 'UPLOAD_THRESHOLD', 16)
+    path = _write_png(tmp_path, 64)
+
+    assert llm_ocr.perform_mistral_ocr(path) == "hello"
+
+    methods = [(method, p.split('?')[0]) for method, p, _, _ in fake_api.calls]
+    assert methods == [('POST', '/files'), ('GET', '/files/file-1/url'), ('POST', '/ocr'), ('DELETE', '/files/file-1')]
+    upload_body = fake_api.calls[0][3]
+    assert b'name="purpose"' in upload_body and b'ocr' in upload_body
+    assert json.loads(fake_api.ocr_calls()[0][3])["document"]["image_url"] == "https://example.invalid/signed"
+
+
+@pytest.mark.parametrize('status', [502, 503, 504])
+def test_gateway_errors_are_retried_with_same_key(fake_api, tmp_path, status):
+    fake_api.ocr_statuses = [status, 200]
+    path = _write_png(tmp_path, 64)
+
+    assert llm_ocr._ocr_with_retry(path, llm_ocr.Limiter()) == "hello"
+
+    calls = fake_api.ocr_calls()
+    assert len(calls) == 2
+    keys = {headers['Idempotency-Key'] for _, _, headers, _ in calls}
+    assert len(keys) == 1
+
+
+def test_upload_is_deleted_when_signed_url_fails(fake_api, monkeypatch, tmp_path):
+    monkeypatch.setattr(llm_ocr, 'UPLOAD_THRESHOLD', 16)
+    fake_api.url_status = 503
+    path = _write_png(tmp_path, 64)
+
+    assert llm_ocr.perform_mistral_ocr(path) == "RATE_LIMIT"
+
+    methods = [(method, p.split('?')[0]) for method, p, _, _ in fake_api.calls]
+    assert methods == [('POST', '/files'), ('GET', '/files/file-1/url'), ('DELETE', '/files/file-1')]
+
+
+@pytest.mark.parametrize('status', [400, 401, 413])
+def test_upload_client_errors_are_not_retried(fake_api, monkeypatch, tmp_path, status):
+    monkeypatch.setattr(llm_ocr, 'UPLOAD_THRESHOLD', 16)
+    fake_api.files_status = status
+    limiter = llm_ocr.Limiter()
+    path = _write_png(tmp_path, 64)
+
+    assert llm_ocr._ocr_with_retry(path, limiter) is None
+
+    assert [(method, p) for method, p, _, _ in fake_api.calls] == [('POST', '/files')]
+    assert limiter.concurrency == limiter.max_concurrency
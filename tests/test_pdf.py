@@ -0,0 +1,45 @@
+import pytest
+
+import pdf
+
+pikepdf = pytest.importorskip('pikepdf')
+
+
+def _write_page_pdfs(tmp_path, count):
+    # 페이지 너비로 순서를 확인 (page_1 → 101pt, page_2 → 102pt, ...)
+    paths = []
+    for i in range(1, count + 1):
+        path = tmp_path / f"page_{i}.pdf"
+        with pikepdf.Pdf.new() as doc:
+            doc.add_blank_page(page_size=(100 + i, 100))
+            doc.save(path)
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize('batch', [2, 200])
+def test_merge_pdfs_keeps_natural_order(tmp_path, monkeypatch, batch):
+    monkeypatch.setattr(pdf, 'MERGE_BATCH', batch)
+    paths = _write_page_pdfs(tmp_path, 11)
+    merged = tmp_path / 'merged.pdf'
+
+    pdf.merge_pdfs(reversed(paths), merged)
+
+    with pikepdf.open(merged) as doc:
+        widths = [int(page.mediabox[2]) for page in doc.pages]
+    assert widths == [100 + i for i in range(1, 12)]
+
+
+def test_process_directory_rerun_does_not_merge_previous_result(tmp_path):
+    book = tmp_path / 'book'
+    book.mkdir()
+    _write_page_pdfs(book, 3)
+    for i in range(1, 4):
+        (book / f"page_{i}.png").write_bytes(b'')
+
+    # PDF가 이미 있으므로 tesseract는 실행되지 않음
+    pdf.process_directory(book, merge=True)
+    pdf.process_directory(book, merge=True)
+
+    with pikepdf.open(book / 'book_merged.pdf') as doc:
+        assert len(doc.pages) == 3
@@ -0,0 +1,70 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+import shot
+
+
+def test_import_does_not_load_numba():
+    code = "import sys, shot; print('numba' in sys.modules)"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=Path(shot.__file__).parent).stdout
+    assert out.strip() == 'False'
+
+
+def test_crop_nonwhite_bbox_with_margin(tmp_path):
+    img = Image.new("RGB", (100, 80), (255, 255, 255))
+    img.paste((0, 0, 0), (10, 20, 60, 70))
+    out = tmp_path / 'out.png'
+
+    cropped = shot.WindowCapture.crop_nonwhite_bbox_with_margin(img, str(out), margin_top=5)
+
+    assert cropped.size == (50, 45)
+    assert Image.open(out).size == (50, 45)
+
+
+FAKE_OSASCRIPT = r'''#!/usr/bin/env python3
+import sys, time
+for line in sys.stdin:
+    if line.startswith('"'):
+        print(line.strip(), flush=True)
+    elif 'hang' in line:
+        time.sleep(60)
+    elif 'fail' in line:
+        print('"__applescript_session_error__-1728: boom"', flush=True)
+    else:
+        print('"ok"', flush=True)
+'''
+
+
+@pytest.fixture
+def fake_osascript(tmp_path, monkeypatch):
+    path = tmp_path / 'osascript'
+    path.write_text(FAKE_OSASCRIPT)
+    path.chmod(0o755)
+    monkeypatch.setenv('PATH', f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+
+
+def test_session_returns_result(fake_osascript):
+    with shot.AppleScriptSession() as osa:
+        assert shot.run_applescript('tell application "Finder" to activate', osa) == '"ok"'
+
+
+def test_session_raises_on_applescript_error(fake_osascript):
+    with shot.AppleScriptSession() as osa:
+        with pytest.raises(RuntimeError, match='boom'):
+            osa.run('fail')
+        assert osa.run('again') == '"ok"'
+
+
+def test_session_times_out_and_respawns(fake_osascript):
+    with shot.AppleScriptSession() as osa:
+        first = osa.proc
+        with pytest.raises(RuntimeError, match='timed out'):
+            osa.run('hang', timeout=0.5)
+        assert first.poll() is not None
+        assert osa.run('again') == '"ok"'